@@ -0,0 +1,117 @@
+import asyncio, re, time, logging
+from collections import deque
+import metrics
+from rest_priority import scheduler as rest, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+alert_events = metrics.registry.counter(
+    "lfg_admin_alerts_total", "Admin alerts by outcome", ("outcome",))
+
+_VOLATILE = re.compile(r"\d+")
+MAX_DM_LENGTH = 2000
+
+
+def fingerprint(msg: str) -> str:
+    # Ids, counts and timings vary between otherwise identical failures
+    return _VOLATILE.sub("#", msg.strip().lower())[:200]
+
+
+# --- Admin alert digest ---
+class AdminAlerts:
+    """
+    Collects admin alerts instead of DMing each one. Identical errors (same
+    fingerprint) are counted rather than repeated, a digest goes out every
+    digest_interval seconds, and at most max_per_hour DMs are sent; while
+    capped, alerts keep accumulating into the next digest.
+    """
+
+    def __init__(self, bot, owner_id: int, digest_interval: float = 30, max_per_hour: int = 20,
+                 max_fingerprints: int = 100):
+        self.bot = bot
+        self.owner_id = owner_id
+        self.digest_interval = digest_interval
+        self.max_per_hour = max_per_hour
+        self.max_fingerprints = max_fingerprints
+        self._channel = None  # cached owner DM channel
+        self._pending = {}  # {fingerprint: [first message, count]}
+        self._overflow = 0  # alerts beyond max_fingerprints distinct errors
+        self._sent_at = deque()  # DM timestamps within the last hour
+        self._task = None
+
+    def report(self, msg: str):
+        alert_events.inc("reported")
+        key = fingerprint(msg)
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry[1] += 1
+            alert_events.inc("deduplicated")
+        elif len(self._pending) >= self.max_fingerprints:
+            self._overflow += 1
+        else:
+            self._pending[key] = [msg, 1]
+
+    @property
+    def pending(self) -> int:
+        return sum(count for _, count in self._pending.values()) + self._overflow
+
+    # --- Delivery ---
+    async def _owner_channel(self):
+        if self._channel is None:
+            user = self.bot.get_user(self.owner_id) or await self.bot.fetch_user(self.owner_id)
+            self._channel = user.dm_channel or await user.create_dm()
+        return self._channel
+
+    def _under_cap(self) -> bool:
+        cutoff = time.monotonic() - 3600
+        while self._sent_at and self._sent_at[0] < cutoff:
+            self._sent_at.popleft()
+        return len(self._sent_at) < self.max_per_hour
+
+    def _digest(self) -> str:
+        total = self.pending
+        lines = [f"[ADMIN DM] {total} alert{'s' if total != 1 else ''} since last digest:"]
+        for msg, count in sorted(self._pending.values(), key=lambda e: -e[1]):
+            line = f"• {msg}" if count == 1 else f"• ({count}x) {msg}"
+            lines.append(line[:300])
+        if self._overflow:
+            lines.append(f"• …plus {self._overflow} alerts of other kinds")
+        text = "\n".join(lines)
+        if len(text) > MAX_DM_LENGTH:
+            text = text[:MAX_DM_LENGTH - 20] + "\n…(truncated)"
+        return text
+
+    async def flush(self):
+        if not self._pending and not self._overflow:
+            return
+        if not self._under_cap():
+            alert_events.inc("capped")
+            return
+        text = self._digest()
+        count = self.pending
+        self._pending = {}
+        self._overflow = 0
+        try:
+            channel = await self._owner_channel()
+            await rest.run(BACKGROUND, channel.send(text))
+            self._sent_at.append(time.monotonic())
+            alert_events.inc("sent", amount=count)
+        except Exception as e:
+            self._channel = None
+            alert_events.inc("failed", amount=count)
+            logger.error(f"Failed to DM admin digest: {e}\n{text}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.digest_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
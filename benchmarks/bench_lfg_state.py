@@ -0,0 +1,137 @@
+"""
+Micro-benchmark for LFGState at 10k concurrent posts.
+
+    python benchmarks/bench_lfg_state.py [posts]
+
+Prints the per-operation cost of the indexed state next to the legacy
+dict/list scans it replaced.
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lfg_state import LFGState
+
+SQUAD_SIZE = 5
+
+
+def timed(label: str, n: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / n * 1e9:>10.0f} ns/op  ({n} ops)")
+
+
+def bench_indexed(posts: int):
+    state = LFGState()
+    users = list(range(1, posts * SQUAD_SIZE + 1))
+    random.shuffle(users)
+    print(f"--- LFGState ({posts} posts) ---")
+
+    def add_posts():
+        for i in range(posts):
+            state.add_post(i, i % 100, users[i], SQUAD_SIZE, vc_id=10_000_000 + i)
+            state.add_vc(10_000_000 + i)
+            state.add_vc(20_000_000 + i, owner_id=users[i])
+
+    def joins():
+        for i in range(posts):
+            for j in range(SQUAD_SIZE):
+                state.join(i, users[i * SQUAD_SIZE + j])
+
+    def membership():
+        for i in range(posts):
+            state.in_squad(i, users[i * SQUAD_SIZE])
+
+    def leaves():
+        for i in range(posts):
+            state.leave(i, users[i * SQUAD_SIZE + 1])
+
+    def quick_joins():
+        # After leaves() every post has exactly one free slot; the lookup and join the post actor runs
+        for i in range(posts):
+            post = state.best_open_post(i % 100, 10**9 + i)
+            state.join(post.msg_id, 10**9 + i)
+
+    def owner_lookup():
+        for i in range(posts):
+            state.owned_vc(users[i])
+
+    def remove_vcs():
+        for i in range(posts):
+            state.remove_vc(20_000_000 + i)
+
+    def remove_posts():
+        for i in range(posts):
+            state.remove_post(i)
+
+    timed("add_post + add_vc x2", posts, add_posts)
+    timed("join", posts * SQUAD_SIZE, joins)
+    timed("in_squad", posts, membership)
+    timed("leave", posts, leaves)
+    timed("best_open_post + join (open squad heap)", posts, quick_joins)
+    assert all(post.is_full for post in state.posts.values())
+    timed("owned_vc", posts, owner_lookup)
+    timed("remove_vc (join-to-create)", posts, remove_vcs)
+    timed("remove_post (cascade)", posts, remove_posts)
+    assert not state.member_posts and not state.host_posts and not state.vc_owner
+
+
+def bench_legacy(posts: int):
+    # The dict/list layout main.py used before LFGState
+    squads = {}
+    user_join_create = {}
+    users = list(range(1, posts * SQUAD_SIZE + 1))
+    for i in range(posts):
+        squads.setdefault(i % 100, {})[i] = [users[i * SQUAD_SIZE + j] for j in range(SQUAD_SIZE)]
+        user_join_create[users[i]] = 20_000_000 + i
+    print(f"--- legacy dicts ({posts} posts) ---")
+
+    def membership():
+        for i in range(posts):
+            users[i * SQUAD_SIZE + 4] in squads[i % 100][i]
+
+    def delete_vc_scan():
+        # delete_vc_safe walked every owner to find the channel's owner
+        for i in range(0, posts, 100):
+            vc_id = 20_000_000 + i
+            for uid, vid in list(user_join_create.items()):
+                if vid == vc_id:
+                    user_join_create.pop(uid, None)
+
+    def quick_join_scan():
+        # Best open squad by scanning the guild's posts for the fewest free slots
+        for i in range(0, posts, 10):
+            guild_squads = squads[i % 100]
+            best = min((mid for mid, squad in guild_squads.items() if len(squad) < SQUAD_SIZE + 1),
+                       key=lambda mid: (SQUAD_SIZE + 1 - len(guild_squads[mid]), -mid), default=None)
+            if best is not None:
+                guild_squads[best].append(10**9 + i)
+
+    timed("user in squad (list)", posts, membership)
+    timed("quick join (scan guild posts)", posts // 10, quick_join_scan)
+    timed("delete_vc owner scan", posts // 100, delete_vc_scan)
+
+
+def check_quick_join_skips_dead_vcs():
+    # A post whose VC was reaped must not be offered, even when it is the closest to full
+    state = LFGState()
+    state.add_post(1, 1, 100, 5, vc_id=1001)
+    state.add_post(2, 1, 200, 5, vc_id=1002)
+    for user_id in (100, 101, 102):
+        state.join(1, user_id)
+    state.join(2, 200)
+    state.add_vc(1001)
+    state.remove_vc(1001)
+    post = state.best_open_post(1, 300)
+    assert post is not None and post.msg_id == 2, "Quick Join picked a post without a voice channel"
+    state.remove_vc(1002)
+    assert state.best_open_post(1, 301) is None
+    print("best_open_post skips posts whose VC is gone: ok")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    check_quick_join_skips_dead_vcs()
+    bench_indexed(n)
+    bench_legacy(n)
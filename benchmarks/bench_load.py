@@ -0,0 +1,205 @@
+"""
+Load test of the bot's handlers against the in-process Discord stand-in.
+
+    python benchmarks/bench_load.py [scenario ...] [--users N] [--latency MS] [--no-limits]
+
+Scenarios (all by default):
+    join_to_create  --users members enter the join-to-create channel at once (default 500)
+    post_joins      one LFG post with 10 slots, --users members click Join at once (default 100)
+    submit_burst    --users members submit the LFG modal at once (default 50)
+    quick_joins     10 posts with 4 free slots each, --users members click Quick Join at once (default 60)
+
+main.py is imported with its config, state database and log file in a
+temporary directory, and bot.get_guild answers from the fake world. Each
+scenario reports throughput, p50/p99 handler latency, REST requests by
+route and the 429s the stand-in's buckets produced. Embed edits and tasks queued by
+the burst are drained before REST calls are counted.
+"""
+import os, sys, json, time, asyncio, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency import LatencyStats
+from fake_discord import FakeRest, FakeWorld, FakeInteraction
+from throttle import Throttle
+
+GUILD_KEY = "bench"
+GUILD_ID = 900_000_000_000_000_001
+OFFICER_ROLE_ID = 900_000_000_000_000_002
+CHANNELS = {
+    "alert": 900_000_000_000_000_010,
+    "posting": 900_000_000_000_000_011,
+    "lfg_category": 900_000_000_000_000_012,
+    "join_to_create": 900_000_000_000_000_013,
+}
+SERVERS = {GUILD_KEY: {"server_id": GUILD_ID, "vc_pool_size": 0, **CHANNELS}}
+DEFAULT_USERS = {"join_to_create": 500, "post_joins": 100, "submit_burst": 50, "quick_joins": 60}
+
+
+# --- Bot under test ---
+def import_bot(workdir: str, servers: dict = SERVERS, officer_role_ids=(OFFICER_ROLE_ID,)):
+    config_path = os.path.join(workdir, "servers.json")
+    with open(config_path, "w") as f:
+        json.dump({"servers": servers, "officer_role_ids": list(officer_role_ids)}, f)
+    os.environ.update(
+        SERVERS_CONFIG=config_path,
+        STATE_DB=os.path.join(workdir, "state.db"),
+        LOG_FILE=os.path.join(workdir, "discord.log"),
+        LOG_LEVEL="WARNING",
+        CONFIG_WATCH_INTERVAL="0",
+    )
+    import main
+    return main
+
+
+def build_world(main, rest: FakeRest, servers: dict = SERVERS) -> FakeWorld:
+    world = FakeWorld(rest, bot_user_id=1)
+    for key, data in servers.items():
+        guild = world.add_guild(data["server_id"], key)
+        guild.add_text_channel("lfg-alerts", data["alert"])
+        guild.add_text_channel("lfg-posting", data["posting"])
+        guild.add_category("LFG", data["lfg_category"])
+        voice = guild.add_category("Voice")
+        guild.add_voice_channel("Join to Create", data["join_to_create"], category=voice)
+    main.bot.get_guild = world.get_guild
+    return world
+
+
+def make_modal(main, member, max_players: int):
+    modal = main.LFGModal(member, GUILD_KEY)
+    modal.host_input._value = member.display_name
+    modal.desc_input._value = f"{member.display_name}'s raid"
+    modal.max_input._value = str(max_players)
+    return modal
+
+
+async def timed(stats: LatencyStats, awaitable):
+    start = time.perf_counter()
+    try:
+        await awaitable
+    finally:
+        stats.record(time.perf_counter() - start)
+
+
+# --- Scenarios ---
+async def join_to_create(main, world, users: int, stats: LatencyStats) -> str:
+    guild = world.get_guild(GUILD_ID)
+    join_channel = guild.get_channel(CHANNELS["join_to_create"])
+    admitted = LatencyStats(window=users)
+
+    async def enter(member):
+        before, after = world.voice_update(member, join_channel)
+        start = time.perf_counter()
+        await timed(stats, main.on_voice_state_update(member, before, after))
+        if main.state.for_guild(GUILD_ID).owned_vc(member.id) is not None:
+            admitted.record(time.perf_counter() - start)
+
+    await asyncio.gather(*(enter(guild.add_member()) for _ in range(users)))
+    created = sum(1 for c in guild.channels.values() if c.name.endswith("'s VC"))
+    return f"{created} VCs created (admitted {admitted.describe()})"
+
+
+async def post_joins(main, world, users: int, stats: LatencyStats) -> str:
+    guild = world.get_guild(GUILD_ID)
+    alert_channel = guild.get_channel(CHANNELS["alert"])
+    host = guild.add_member()
+    await make_modal(main, host, 10).on_submit(FakeInteraction(guild, host))
+    msg = list(alert_channel.messages.values())[-1]
+    world.rest.calls.clear()
+    world.rest.rate_limited.clear()
+
+    clicks = [msg.view.join_button.callback(FakeInteraction(guild, guild.add_member(), msg)) for _ in range(users)]
+    await asyncio.gather(*(timed(stats, click) for click in clicks))
+    post = main.state.for_guild(GUILD_ID).get_post(msg.id)
+    return f"squad {len(post.members)}/{post.max_players}"
+
+
+async def submit_burst(main, world, users: int, stats: LatencyStats) -> str:
+    guild = world.get_guild(GUILD_ID)
+    submits = []
+    for _ in range(users):
+        member = guild.add_member()
+        submits.append(make_modal(main, member, 5).on_submit(FakeInteraction(guild, member)))
+    await asyncio.gather(*(timed(stats, submit) for submit in submits))
+    posts = len(main.state.for_guild(GUILD_ID).guild_post_ids(GUILD_ID))
+    return f"{posts} posts open"
+
+
+async def quick_joins(main, world, users: int, stats: LatencyStats) -> str:
+    guild = world.get_guild(GUILD_ID)
+    # Earlier scenarios may have spent the guild's submit budget; the seed posts aren't what's measured
+    main.submit_throttle = Throttle("lfg_submit", 100, 60, 100, 10)
+    for _ in range(10):
+        host = guild.add_member()
+        await make_modal(main, host, 5).on_submit(FakeInteraction(guild, host))
+    world.rest.calls.clear()
+    world.rest.rate_limited.clear()
+
+    view = main.DeployLFGButtonView(GUILD_KEY)
+    clicks = [view.quick_join_button.callback(FakeInteraction(guild, guild.add_member())) for _ in range(users)]
+    await asyncio.gather(*(timed(stats, click) for click in clicks))
+    guild_state = main.state.for_guild(GUILD_ID)
+    posts = [guild_state.get_post(msg_id) for msg_id in guild_state.guild_post_ids(GUILD_ID)]
+    overfilled = sum(len(post.members) > post.max_players for post in posts)
+    assert not overfilled, f"{overfilled} squads overfilled"
+    return (f"{sum(len(post.members) for post in posts)} members in {sum(post.is_full for post in posts)}/"
+            f"{len(posts)} full squads, {main.post_actors.contended} contended")
+
+
+SCENARIOS = {"join_to_create": join_to_create, "post_joins": post_joins, "submit_burst": submit_burst,
+             "quick_joins": quick_joins}
+
+
+# --- Runner ---
+async def drain_background(main):
+    # Embed edits and spawned tasks (move-backs, notices) finish before REST calls are counted
+    while main.embed_updates._tasks or main.background_tasks:
+        pending = list(main.embed_updates._tasks.values()) + list(main.background_tasks)
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def print_rest(rest: FakeRest):
+    rest_stats = rest.stats()
+    print(f"  REST             {rest_stats['calls']} requests, {rest_stats['rate_limited']} 429s")
+    for route, (count, limited) in rest_stats["routes"].items():
+        print(f"    {route:<54} {count:>6} {limited:>5} 429s")
+
+
+async def run(names: list, users: int, latency: float, limits: bool):
+    with tempfile.TemporaryDirectory() as workdir:
+        main = import_bot(workdir)
+        await main.state_store.open()
+        main.vc_expiry.start()
+        try:
+            for name in names:
+                rest = FakeRest(latency=latency, limits=None if limits else {}, global_limit=50 if limits else 0)
+                world = build_world(main, rest)
+                n = users or DEFAULT_USERS[name]
+                stats = LatencyStats(window=n)
+                errors_before = main.admin_alerts.pending
+
+                start = time.perf_counter()
+                outcome = await SCENARIOS[name](main, world, n, stats)
+                elapsed = time.perf_counter() - start
+                await drain_background(main)
+
+                print(f"{name}: {n} events in {elapsed:.2f}s ({n / elapsed:.1f}/s), {outcome}, "
+                      f"{main.admin_alerts.pending - errors_before} handler errors")
+                print(f"  handler latency  {stats.describe()} max={stats.max * 1000:.0f}ms")
+                print_rest(rest)
+        finally:
+            main.vc_expiry.stop()
+            await main.state_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenarios", nargs="*", help=", ".join(SCENARIOS))
+    parser.add_argument("--users", type=int, default=0, help="burst size (default per scenario)")
+    parser.add_argument("--latency", type=float, default=50, help="REST round trip in ms")
+    parser.add_argument("--no-limits", action="store_true", help="disable the stand-in's rate limits")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario {', '.join(sorted(unknown))}")
+    asyncio.run(run(args.scenarios or list(SCENARIOS), args.users, args.latency / 1000, not args.no_limits))
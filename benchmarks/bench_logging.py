@@ -0,0 +1,74 @@
+"""
+Event loop latency with logging off, the old synchronous file handler, and
+the queued/sampled setup from logging_setup.
+
+    python benchmarks/bench_logging.py [seconds]
+
+A producer task logs gateway-sized DEBUG payloads the way discord.py does
+at DEBUG level while a probe measures how late a 1 ms sleep wakes up.
+"""
+import os, sys, time, asyncio, logging, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_setup import setup_logging, stop_logging, LOG_FORMAT, DATE_FORMAT
+
+PAYLOAD = "{'t': 'VOICE_STATE_UPDATE', 's': 42, 'op': 0, 'd': {" + ", ".join(
+    f"'field{i}': '{'x' * 20}'" for i in range(60)) + "}}"
+
+
+def reset_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.WARNING)
+
+
+async def run(seconds: float) -> dict:
+    gateway = logging.getLogger("discord.gateway")
+    lags = []
+    stop = time.perf_counter() + seconds
+
+    async def producer():
+        while time.perf_counter() < stop:
+            for _ in range(50):
+                gateway.debug("For Shard ID %s: WebSocket Event: %s", 0, PAYLOAD)
+            await asyncio.sleep(0)
+
+    async def probe():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    await asyncio.gather(producer(), probe())
+    lags.sort()
+    return {"p50": lags[len(lags) // 2] * 1000, "p99": lags[int(len(lags) * 0.99)] * 1000, "max": lags[-1] * 1000}
+
+
+def report(label: str, result: dict):
+    print(f"{label:<28} p50={result['p50']:6.2f}ms p99={result['p99']:6.2f}ms max={result['max']:6.2f}ms")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    tmp = tempfile.mkdtemp()
+
+    reset_logging()
+    report("logging off", asyncio.run(run(seconds)))
+
+    reset_logging()
+    logging.basicConfig(level=logging.DEBUG, filename=os.path.join(tmp, "sync.log"), encoding="utf-8",
+                        filemode="w", format=LOG_FORMAT, datefmt=DATE_FORMAT)
+    report("sync FileHandler (old)", asyncio.run(run(seconds)))
+
+    reset_logging()
+    listener = setup_logging(filename=os.path.join(tmp, "queued.log"), sample_rate=1, max_chars=0)
+    report("queued, no sampling", asyncio.run(run(seconds)))
+    stop_logging(listener)
+
+    reset_logging()
+    listener = setup_logging(filename=os.path.join(tmp, "sampled.log"))
+    report("queued + sampled/truncated", asyncio.run(run(seconds)))
+    stop_logging(listener)
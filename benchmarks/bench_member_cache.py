@@ -0,0 +1,82 @@
+"""
+Memory held per 10k guild members under the "full" and "lean" MEMBER_CACHE modes.
+
+    python benchmarks/bench_member_cache.py [members]
+
+Feeds synthetic GUILD_MEMBER_ADD payloads through discord.py's real
+ConnectionState with each mode's MemberCacheFlags, so what gets cached is
+decided by the library exactly as it would be in the bot. Members sitting
+in voice channels are cached in both modes and are not part of this
+measurement.
+"""
+import sys, gc, tracemalloc
+
+import discord
+from discord.state import ConnectionState
+
+GUILD_ID = 911035631193444412
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def make_state(flags: discord.MemberCacheFlags) -> ConnectionState:
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.voice_states = True
+    return ConnectionState(dispatch=lambda *args, **kwargs: None, handlers={}, hooks={}, http=None,
+                           intents=intents, member_cache_flags=flags, chunk_guilds_at_startup=False)
+
+
+def member_payload(i: int) -> dict:
+    return {
+        "guild_id": str(GUILD_ID),
+        "user": {"id": str(10**17 + i), "username": f"member{i}", "discriminator": "0", "avatar": None,
+                 "global_name": f"Member {i}"},
+        "nick": None,
+        "roles": [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def measure(label: str, flags: discord.MemberCacheFlags, members: int):
+    gc.collect()
+    tracemalloc.start()
+    rss_before = rss_kb()
+
+    state = make_state(flags)
+    guild = discord.Guild(data={"id": str(GUILD_ID), "name": "bench", "member_count": 0}, state=state)
+    state._add_guild(guild)
+    for i in range(members):
+        state.parse_guild_member_add(member_payload(i))
+    gc.collect()
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_delta = rss_kb() - rss_before
+    per_10k = current / members * 10_000 / 1024
+    print(f"{label:<6} cached={len(guild.members):>7} traced={current / 1024:9.0f}KiB "
+          f"({per_10k:7.0f}KiB per 10k members) rss_delta={rss_delta}KiB")
+    return state
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.voice_states = True
+
+    full = measure("full", discord.MemberCacheFlags.from_intents(intents), n)
+    del full
+
+    lean_flags = discord.MemberCacheFlags.none()
+    lean_flags.voice = True
+    measure("lean", lean_flags, n)
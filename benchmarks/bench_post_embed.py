@@ -0,0 +1,82 @@
+"""
+Render cost per squad update: the cached PostEmbeds renderer against the
+old copy-the-message-embed-and-search-its-fields approach.
+
+    python benchmarks/bench_post_embed.py [updates]
+
+Two workloads: a 5-player squad churning through joins and leaves, and an
+unlimited post growing to 500 members. For the latter the old renderer's
+"Current Squad" value passes Discord's 1024 character field limit (the
+edit is rejected) after a few dozen members; the count of such renders is
+reported alongside the timings. Needs discord.py for discord.Embed.
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from lfg_state import LFGState
+from post_embed import PostEmbeds, new_post_embed, FIELD_LIMIT
+
+
+def legacy_render(message_embed: discord.Embed, post) -> discord.Embed:
+    # What update_embed did before: copy the received embed, rebuild the squad text, scan for the field
+    embed = message_embed.copy()
+    max_label = "∞" if post.max_players == 0 else str(post.max_players)
+    value = "\n".join([f"{i + 1}/{max_label} <@{user_id}>" for i, user_id in enumerate(post.members)]) or "Empty"
+    for i, f in enumerate(embed.fields):
+        if f.name == "Current Squad":
+            embed.set_field_at(i, name="Current Squad", value=value, inline=False)
+    return embed
+
+
+def oversized(embed: discord.Embed) -> bool:
+    return any(len(f.value) > FIELD_LIMIT for f in embed.fields)
+
+
+def churn(max_players: int, updates: int, grow: bool):
+    rng = random.Random(7)
+    state = LFGState()
+    post = state.add_post(1, 1, 10**17, max_players, vc_id=10**18, channel_id=42,
+                          title="Ranked grind, mics on", host_name="Hog")
+    state.join(1, 10**17)
+    users = [10**17 + i for i in range(1, 10_000)]
+    for n in range(updates):
+        if grow:
+            state.join(1, users[n])
+        elif not post.members or (rng.random() < 0.6 and not post.is_full):
+            state.join(1, rng.choice(users))
+        else:
+            state.leave(1, post.members[rng.randrange(len(post.members))])
+        yield post
+
+
+def bench(label: str, max_players: int, updates: int, grow: bool):
+    renderer = PostEmbeds()
+    message_embed = new_post_embed("Ranked grind, mics on", "Hog", 10**18, max_players, [10**17])
+
+    legacy_time = new_time = 0.0
+    legacy_bad = new_bad = n = 0
+    for post in churn(max_players, updates, grow):
+        start = time.perf_counter()
+        embed = legacy_render(message_embed, post)
+        legacy_time += time.perf_counter() - start
+        legacy_bad += oversized(embed)
+        message_embed = embed  # the next edit copies what Discord echoed back
+
+        start = time.perf_counter()
+        embed = renderer.render(post)
+        new_time += time.perf_counter() - start
+        new_bad += oversized(embed)
+        n += 1
+
+    print(f"--- {label} ({n} updates, final squad {len(post.members)}) ---")
+    print(f"  copy + field scan   {legacy_time / n * 1e6:>8.1f} us/render  {legacy_bad} renders over {FIELD_LIMIT} chars")
+    print(f"  cached template     {new_time / n * 1e6:>8.1f} us/render  {new_bad} renders over {FIELD_LIMIT} chars"
+          f"  ({renderer.lines_formatted} squad lines formatted)")
+
+
+if __name__ == "__main__":
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    bench("5-player squad, joins and leaves", 5, updates, grow=False)
+    bench("unlimited squad growing", 0, min(updates, 500), grow=True)
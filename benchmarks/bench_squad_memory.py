@@ -0,0 +1,62 @@
+"""
+Memory of open LFG posts: the slotted Post with an array of member ids
+versus the old layout that kept discord.Member objects per squad.
+
+    python benchmarks/bench_squad_memory.py [posts]
+
+discord.Member is stood in for by a slotted object with the same number
+of attributes, so the "members" column is what squads pinned once a
+member left the guild (or was never cached, in lean member-cache mode).
+"""
+import os, sys, gc, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lfg_state import Post
+
+SQUAD_SIZE = 6
+
+
+class FakeMember:
+    # discord.Member in discord.py 2.x declares this many slots
+    __slots__ = ("_roles", "joined_at", "premium_since", "_activities", "guild", "pending", "nick",
+                 "timed_out_until", "_permissions", "_client_status", "_user", "_state", "_avatar", "_flags")
+
+    def __init__(self, user_id: int):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self._user = user_id
+
+
+def legacy(posts: int):
+    # squads[guild_id][msg_id] = [discord.Member, ...] plus the per-post metadata main.py tracked
+    squads = {}
+    for i in range(posts):
+        squads.setdefault(i % 10, {})[i] = [FakeMember(10**17 + i * SQUAD_SIZE + j) for j in range(SQUAD_SIZE)]
+    return squads
+
+
+def compact(posts: int):
+    records = {}
+    for i in range(posts):
+        post = Post(i, i % 10, 10**17 + i, SQUAD_SIZE, vc_id=10**18 + i, channel_id=42)
+        post.members.extend(10**17 + i * SQUAD_SIZE + j for j in range(SQUAD_SIZE))
+        records[i] = post
+    return records
+
+
+def measure(label: str, build, posts: int):
+    gc.collect()
+    tracemalloc.start()
+    data = build(posts)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {current / 1024:9.0f}KiB  {current / posts:7.0f} B/post")
+    return data
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    print(f"{n} open posts, {SQUAD_SIZE} members each")
+    measure("list of Member objects (old)", legacy, n)
+    measure("slotted Post + array('Q') ids", compact, n)
@@ -0,0 +1,90 @@
+"""
+Voice event routing throughput as the number of configured guilds grows.
+
+    python benchmarks/bench_voice_routing.py
+
+Compares the precomputed VoiceRoutes fast path with the old loop over
+every SERVERS entry. The event mix is mostly irrelevant traffic (members
+moving between ordinary channels, mute toggles) with a few managed VC and
+join-to-create hits, which is what a busy guild looks like.
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import VoiceRoutes, route_voice_event
+
+EVENTS = 200_000
+
+
+def make_servers(n: int) -> dict:
+    return {
+        f"guild{i}": {
+            "server_id": 1_000_000 + i,
+            "alert": 2_000_000 + i,
+            "posting": 3_000_000 + i,
+            "lfg_category": 4_000_000 + i,
+            "join_to_create": 5_000_000 + i,
+        }
+        for i in range(n)
+    }
+
+
+def make_events(servers: dict, managed: set) -> list:
+    rng = random.Random(42)
+    joins = [data["join_to_create"] for data in servers.values()]
+    managed_ids = list(managed)
+    events = []
+    for _ in range(EVENTS):
+        roll = rng.random()
+        if roll < 0.02:
+            events.append((rng.randrange(9_000_000, 9_100_000), rng.choice(joins)))
+        elif roll < 0.05:
+            events.append((rng.choice(managed_ids), rng.randrange(9_000_000, 9_100_000)))
+        elif roll < 0.5:
+            channel = rng.randrange(9_000_000, 9_100_000)
+            events.append((channel, channel))
+        else:
+            events.append((rng.choice((None, rng.randrange(9_000_000, 9_100_000))),
+                           rng.randrange(9_000_000, 9_100_000)))
+    return events
+
+
+def legacy(servers: dict, managed: set, events: list) -> int:
+    hits = 0
+    for before_id, after_id in events:
+        if before_id is not None and before_id in managed:
+            hits += 1
+        if after_id is not None and after_id in managed:
+            hits += 1
+        for key, data in servers.items():
+            if after_id is not None and after_id == data["join_to_create"]:
+                hits += 1
+    return hits
+
+
+def routed(routes: VoiceRoutes, managed: set, events: list) -> int:
+    hits = 0
+    for before_id, after_id in events:
+        if route_voice_event(routes, managed, before_id, after_id) is not None:
+            hits += 1
+    return hits
+
+
+if __name__ == "__main__":
+    print(f"{'guilds':>7} {'legacy ev/s':>14} {'routed ev/s':>14} {'speedup':>8}")
+    for n in (2, 10, 50, 100, 250, 500):
+        servers = make_servers(n)
+        managed = {8_000_000 + i for i in range(max(50, n * 5))}
+        routes = VoiceRoutes(servers)
+        events = make_events(servers, managed)
+
+        start = time.perf_counter()
+        legacy(servers, managed, events)
+        legacy_rate = EVENTS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        routed(routes, managed, events)
+        routed_rate = EVENTS / (time.perf_counter() - start)
+
+        print(f"{n:>7} {legacy_rate:>14,.0f} {routed_rate:>14,.0f} {routed_rate / legacy_rate:>7.1f}x")
@@ -0,0 +1,79 @@
+"""
+Startup time, RSS and thread count of the old Flask keep-alive thread
+versus the aiohttp server now running on the bot's loop.
+
+    python benchmarks/bench_webserver.py
+
+Each variant runs in a fresh interpreter, imports its framework, starts
+listening on a free port and reports once a client connection succeeds.
+"""
+import sys, json, subprocess, textwrap
+
+FLASK = textwrap.dedent("""
+    import time, socket, threading, json
+    start = time.perf_counter()
+    from flask import Flask
+    app = Flask('')
+    @app.route('/')
+    def home():
+        return 'Bot is running'
+    port = int(PORT)
+    threading.Thread(target=lambda: app.run(host='127.0.0.1', port=port), daemon=True).start()
+""")
+
+AIOHTTP = textwrap.dedent("""
+    import time, socket, threading, json, asyncio
+    start = time.perf_counter()
+    from aiohttp import web
+    async def home(request):
+        return web.Response(text='Bot is running')
+    async def serve():
+        app = web.Application()
+        app.router.add_get('/', home)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', int(PORT)).start()
+    # The listening socket accepts connections once TCPSite.start() returns; no extra thread involved
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(serve())
+""")
+
+REPORT = textwrap.dedent("""
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', int(PORT)), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    rss = 0
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1])
+    print(json.dumps({'startup_ms': elapsed * 1000, 'rss_kb': rss, 'threads': threading.active_count()}))
+""")
+
+
+def free_port() -> int:
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(label: str, body: str):
+    code = f"PORT = {free_port()}\n" + body + REPORT
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    if proc.returncode != 0:
+        reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+        print(f"{label:<24} skipped: {reason}")
+        return
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    print(f"{label:<24} startup={result['startup_ms']:7.1f}ms rss={result['rss_kb'] / 1024:6.1f}MiB "
+          f"threads={result['threads']}")
+
+
+if __name__ == "__main__":
+    measure("Flask thread (old)", FLASK)
+    measure("aiohttp on loop (new)", AIOHTTP)
@@ -0,0 +1,309 @@
+"""
+In-process stand-in for the parts of Discord the bot talks to, used by the
+load-test and replay benchmarks.
+
+Guilds, channels, members, messages and interactions are plain objects whose
+REST-backed methods (create_voice_channel, move_to, send, edit, delete and
+the interaction responses) go through FakeRest. FakeRest adds a round-trip
+latency, counts requests per route and enforces per-route buckets plus the
+global limit. The first request to find a bucket empty counts as a 429 and
+is retried once the bucket refills; requests queued behind it on the same
+bucket then wait without a 429, the way discord.py's HTTP client sleeps on
+a bucket it already knows is exhausted.
+"""
+import os, sys, asyncio, itertools
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embed_updates import ChannelBucket
+
+# route: (requests, per seconds). Discord only documents the global and message
+# limits; the others are in the range its rate limit headers report.
+ROUTE_LIMITS = {
+    "POST /guilds/{guild_id}/channels": (10, 1.0),
+    "PATCH /guilds/{guild_id}/members/{user_id}": (10, 1.0),
+    "PATCH /channels/{channel_id}": (2, 600.0),  # channel renames
+    "DELETE /channels/{channel_id}": (5, 1.0),
+    "GET /channels/{channel_id}/messages/{message_id}": (5, 1.0),
+    "POST /channels/{channel_id}/messages": (5, 5.0),
+    "PATCH /channels/{channel_id}/messages/{message_id}": (5, 5.0),
+    "DELETE /channels/{channel_id}/messages/{message_id}": (5, 1.0),
+}
+GLOBAL_LIMIT = 50  # requests per second; interaction callbacks and followups are exempt
+
+
+# --- REST stand-in ---
+class FakeRest:
+    def __init__(self, latency: float = 0.05, limits: dict = None, global_limit: int = GLOBAL_LIMIT):
+        self.latency = latency
+        self.limits = ROUTE_LIMITS if limits is None else limits
+        self.global_bucket = ChannelBucket(global_limit, 1.0) if global_limit else None
+        self.calls = Counter()  # {route: requests, 429s included}
+        self.rate_limited = Counter()  # {route: 429s}
+        self._buckets = {}  # {(route, major id): ChannelBucket}
+        self._locks = {}  # {(route, major id): asyncio.Lock}
+        self._exhausted = set()  # bucket keys the client has already seen a 429 on
+
+    async def request(self, route: str, major=None, exempt: bool = False):
+        key = (route, major)
+        bucket = self._buckets.get(key)
+        if bucket is None and route in self.limits:
+            bucket = self._buckets[key] = ChannelBucket(*self.limits[route])
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            self.calls[route] += 1
+            while True:
+                wait = bucket.delay() if bucket else 0.0
+                if self.global_bucket and not exempt:
+                    wait = max(wait, self.global_bucket.delay())
+                if not wait:
+                    break
+                if key not in self._exhausted:
+                    self._exhausted.add(key)
+                    self.rate_limited[route] += 1
+                    self.calls[route] += 1  # the retry is a second request
+                await asyncio.sleep(wait)
+            if bucket is None or bucket.tokens >= 2:
+                # Refilled past this request, so the client no longer knows the bucket as empty
+                self._exhausted.discard(key)
+            if bucket:
+                bucket.consume()
+            if self.global_bucket and not exempt:
+                self.global_bucket.consume()
+        await asyncio.sleep(self.latency)
+
+    def stats(self) -> dict:
+        return {
+            "calls": sum(self.calls.values()),
+            "rate_limited": sum(self.rate_limited.values()),
+            "routes": {route: (count, self.rate_limited[route]) for route, count in self.calls.most_common()},
+        }
+
+
+# --- Discord objects ---
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+
+class FakeVoiceState:
+    def __init__(self, channel=None):
+        self.channel = channel
+
+
+class FakeMember:
+    def __init__(self, guild, user_id: int, name: str, roles=()):
+        self.guild = guild
+        self.id = user_id
+        self.name = self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.roles = list(roles)
+        self.voice = None
+
+    def _set_channel(self, channel):
+        if self.voice and self.voice.channel:
+            self.voice.channel.members.remove(self)
+        self.voice = FakeVoiceState(channel) if channel else None
+        if channel:
+            channel.members.append(self)
+
+    async def move_to(self, channel):
+        await self.guild.world.rest.request("PATCH /guilds/{guild_id}/members/{user_id}", self.guild.id)
+        self._set_channel(channel)
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.world.rest.request("POST /channels/{channel_id}/messages", ("dm", self.id))
+
+
+class FakeCategory:
+    def __init__(self, guild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+
+    @property
+    def voice_channels(self) -> list:
+        return [c for c in self.guild.channels.values() if isinstance(c, FakeVoiceChannel) and c.category is self]
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild, channel_id: int, name: str, category=None, user_limit: int = 0):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category = category
+        self.user_limit = user_limit
+        self.mention = f"<#{channel_id}>"
+        self.members = []
+
+    async def edit(self, name=None, **kwargs):
+        await self.guild.world.rest.request("PATCH /channels/{channel_id}", self.id)
+        if name is not None:
+            self.name = name
+
+    async def delete(self):
+        await self.guild.world.rest.request("DELETE /channels/{channel_id}", self.id)
+        self.guild.channels.pop(self.id, None)
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id: int, content=None, embed=None, view=None):
+        self.channel = channel
+        self.guild = channel.guild
+        self.id = message_id
+        self.content = content
+        self.embeds = [embed] if embed else []
+        self.view = view
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        await self.guild.world.rest.request("PATCH /channels/{channel_id}/messages/{message_id}", self.channel.id)
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+
+    async def delete(self):
+        await self.guild.world.rest.request("DELETE /channels/{channel_id}/messages/{message_id}", self.channel.id)
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeTextChannel:
+    def __init__(self, guild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        await self.guild.world.rest.request("POST /channels/{channel_id}/messages", self.id)
+        msg = FakeMessage(self, self.guild.world.next_id(), content, embed, view)
+        self.messages[msg.id] = msg
+        return msg
+
+    async def fetch_message(self, message_id: int):
+        await self.guild.world.rest.request("GET /channels/{channel_id}/messages/{message_id}", self.id)
+        return self.messages[message_id]
+
+    def get_partial_message(self, message_id: int):
+        # discord.PartialMessage: edit/delete by id without fetching
+        return self.messages.get(message_id) or FakeMessage(self, message_id)
+
+
+class FakeGuild:
+    def __init__(self, world, guild_id: int, name: str, shard_id: int = 0):
+        self.world = world
+        self.id = guild_id
+        self.name = name
+        self.shard_id = shard_id
+        self.channels = {}
+        self.members = {}
+        self.default_role = FakeRole(guild_id)
+        self.me = FakeMember(self, world.bot_user_id, "bot")
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    def _add(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def add_category(self, name: str, channel_id: int = None) -> FakeCategory:
+        return self._add(FakeCategory(self, channel_id or self.world.next_id(), name))
+
+    def add_text_channel(self, name: str, channel_id: int = None) -> FakeTextChannel:
+        return self._add(FakeTextChannel(self, channel_id or self.world.next_id(), name))
+
+    def add_voice_channel(self, name: str, channel_id: int = None, category=None, user_limit: int = 0):
+        return self._add(FakeVoiceChannel(self, channel_id or self.world.next_id(), name, category, user_limit))
+
+    def add_member(self, user_id: int = None, name: str = None, roles=()) -> FakeMember:
+        user_id = user_id or self.world.next_id()
+        member = self.members[user_id] = FakeMember(self, user_id, name or f"user{user_id % 100000}", roles)
+        return member
+
+    async def create_voice_channel(self, name: str, overwrites=None, category=None, user_limit: int = 0, **kwargs):
+        await self.world.rest.request("POST /guilds/{guild_id}/channels", self.id)
+        return self.add_voice_channel(name, category=category, user_limit=user_limit)
+
+
+# --- Interactions ---
+class InteractionResponded(Exception):
+    pass
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise InteractionResponded("This interaction has already been responded to before")
+        self._done = True
+        await self._interaction.guild.world.rest.request(
+            "POST /interactions/{interaction_id}/{token}/callback", self._interaction.id, exempt=True)
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond()
+
+    async def send_modal(self, modal):
+        await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self._interaction.guild.world.rest.request(
+            "POST /webhooks/{application_id}/{token}", self._interaction.id, exempt=True)
+
+
+class FakeInteraction:
+    def __init__(self, guild, user, message=None):
+        self.id = guild.world.next_id()
+        self.guild = guild
+        self.user = user
+        self.message = message
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+# --- World ---
+class FakeWorld:
+    """Every fake guild, plus the REST stand-in their objects call through."""
+
+    def __init__(self, rest: FakeRest, bot_user_id: int = 1):
+        self.rest = rest
+        self.bot_user_id = bot_user_id
+        self.guilds = {}
+        self._ids = itertools.count(10**18)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add_guild(self, guild_id: int, name: str, shard_id: int = 0) -> FakeGuild:
+        guild = self.guilds[guild_id] = FakeGuild(self, guild_id, name, shard_id)
+        return guild
+
+    def get_guild(self, guild_id: int):
+        return self.guilds.get(guild_id)
+
+    def voice_update(self, member: FakeMember, channel):
+        """Applies a member's voice move locally and returns (before, after) as the gateway would send them."""
+        before = FakeVoiceState(member.voice.channel if member.voice else None)
+        member._set_channel(channel)
+        return before, FakeVoiceState(channel)
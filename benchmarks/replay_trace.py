@@ -0,0 +1,252 @@
+"""
+Replays a captured event trace into the bot's handlers against the
+in-process Discord stand-in.
+
+    python benchmarks/replay_trace.py TRACE [--speed X] [--latency MS] [--no-limits] [--json OUT]
+
+Traces come from TRACE_FILE or the !trace owner command. --speed 1 keeps
+the recorded pacing, 10 replays ten times faster and 0 as fast as the
+handlers allow. Each event is dispatched as its own task at its offset,
+the same way discord.py dispatches gateway events.
+
+The stand-in starts from the trace header: the guild config, who was in
+voice, and the VCs the bot already managed. VCs and posts the bot created
+during capture are matched to the ones it creates during replay through
+the trace's "vc" and "post" records and the replay's own state. Events
+that reference posts from before the capture are counted as unmapped and
+skipped. --json writes the summary so runs before and after a change can
+be diffed.
+"""
+import os, sys, json, time, asyncio, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_trace import read_trace, TRACE_VERSION
+from latency import LatencyStats, StepLatency
+from fake_discord import FakeRest, FakeRole, FakeInteraction
+from bench_load import import_bot, build_world, drain_background, print_rest
+
+RESOLVE_TIMEOUT = 5.0  # how long a replayed event waits for the VC/post it references to be created
+
+
+class Replayer:
+    def __init__(self, main, world, header: dict):
+        self.main = main
+        self.world = world
+        self.officer_role = FakeRole(header["officer_role_ids"][0]) if header["officer_role_ids"] else None
+        self.created_vcs = {}  # {trace vc id: (guild id, owner id)}
+        self.created_posts = {}  # {trace msg id: (guild id, host id)}
+        self.post_vcs = {}  # {trace vc id: trace msg id}
+        self.channels = {}  # {trace channel id: fake channel}
+        self.messages = {}  # {trace msg id: fake message}
+        self.handlers = StepLatency(window=100_000)
+        self.lateness = LatencyStats(window=100_000)
+        self.unmapped = 0
+        self.failed = 0  # replay-side errors; handler errors go through dm_admin as in production
+        self._tasks = set()
+
+        for guild_id, channels in header.get("voice", {}).items():
+            guild = world.get_guild(int(guild_id))
+            for channel_id, user_ids in channels.items():
+                channel = guild.get_channel(int(channel_id)) or guild.add_voice_channel("vc", int(channel_id))
+                for user_id in user_ids:
+                    world.voice_update(self.member(guild, user_id), channel)
+        for guild_id, vcs in header.get("managed", {}).items():
+            guild = world.get_guild(int(guild_id))
+            for vc_id, owner_id in vcs:
+                guild.get_channel(vc_id) or guild.add_voice_channel("managed", vc_id)
+                main.state.for_guild(guild.id).add_vc(vc_id, owner_id=owner_id)
+
+    # --- Id mapping ---
+    def member(self, guild, user_id: int, officer: bool = False):
+        member = guild.get_member(user_id) or guild.add_member(user_id)
+        if officer and self.officer_role and self.officer_role not in member.roles:
+            member.roles.append(self.officer_role)
+        return member
+
+    def _newest_post(self, guild_id: int, host_id: int):
+        msg_ids = self.main.state.for_guild(guild_id).host_posts.get(host_id)
+        return self.main.state.for_guild(guild_id).get_post(max(msg_ids)) if msg_ids else None
+
+    def _resolve_channel(self, guild, channel_id: int):
+        if channel_id in self.created_vcs:
+            guild_id, owner_id = self.created_vcs[channel_id]
+            vc_id = self.main.state.for_guild(guild_id).owned_vc(owner_id)
+        else:
+            guild_id, host_id = self.created_posts[self.post_vcs[channel_id]]
+            post = self._newest_post(guild_id, host_id)
+            vc_id = post.vc_id if post else None
+        return guild.get_channel(vc_id) if vc_id else None
+
+    async def channel(self, guild, channel_id: int):
+        if channel_id is None:
+            return None
+        channel = self.channels.get(channel_id) or guild.get_channel(channel_id)
+        if channel is None and (channel_id in self.created_vcs or channel_id in self.post_vcs):
+            # The replayed handler that creates it may still be waiting on REST
+            deadline = time.monotonic() + RESOLVE_TIMEOUT
+            while channel is None and time.monotonic() < deadline:
+                channel = self._resolve_channel(guild, channel_id)
+                if channel is None:
+                    await asyncio.sleep(0.01)
+        if channel is None:
+            channel = guild.add_voice_channel("vc", channel_id)
+        self.channels[channel_id] = channel
+        return channel
+
+    async def message(self, guild, msg_id: int):
+        if msg_id in self.messages:
+            return self.messages[msg_id]
+        if msg_id not in self.created_posts:
+            return None
+        guild_id, host_id = self.created_posts[msg_id]
+        deadline = time.monotonic() + RESOLVE_TIMEOUT
+        while time.monotonic() < deadline:
+            post = self._newest_post(guild_id, host_id)
+            if post:
+                msg = self.messages[msg_id] = guild.get_channel(post.channel_id).messages[post.msg_id]
+                return msg
+            await asyncio.sleep(0.01)
+        return None
+
+    # --- Dispatch ---
+    async def handle(self, record: dict):
+        guild = self.world.get_guild(record["g"])
+        if guild is None:
+            self.unmapped += 1
+            return
+        if record["e"] == "voice":
+            step = "voice_state_update"
+            before = await self.channel(guild, record["b"])
+            after = await self.channel(guild, record["a"])
+            member = self.member(guild, record["u"])
+            if member.voice is None or member.voice.channel is not before:
+                self.world.voice_update(member, before)
+            before_state, after_state = self.world.voice_update(member, after)
+            start = time.perf_counter()
+            await self.main.on_voice_state_update(member, before_state, after_state)
+        elif record["k"] == "modal":
+            step = "lfg_submit"
+            member = self.member(guild, record["u"], record.get("o"))
+            host, desc, max_players = (record.get("v") or ["", "", "0"])[:3]
+            modal = self.main.LFGModal(member, self.main.config.current.routes.guild_key(guild.id))
+            modal.host_input._value, modal.desc_input._value, modal.max_input._value = host, desc, max_players
+            start = time.perf_counter()
+            await modal.on_submit(FakeInteraction(guild, member))
+        elif record["c"] in ("deploy_lfg", "lfg_quick_join"):
+            step = record["c"]
+            member = self.member(guild, record["u"], record.get("o"))
+            view = self.main.DeployLFGButtonView(self.main.config.current.routes.guild_key(guild.id))
+            button = view.deploy_button if step == "deploy_lfg" else view.quick_join_button
+            start = time.perf_counter()
+            await button.callback(FakeInteraction(guild, member))
+        elif record["c"] in ("lfg_join", "lfg_leave", "lfg_delete"):
+            step = record["c"]
+            msg = await self.message(guild, record.get("m"))
+            if msg is None or msg.view is None:
+                self.unmapped += 1
+                return
+            member = self.member(guild, record["u"], record.get("o"))
+            button = getattr(msg.view, step.replace("lfg_", "") + "_button")
+            start = time.perf_counter()
+            await button.callback(FakeInteraction(guild, member, msg))
+        else:
+            self.unmapped += 1
+            return
+        self.handlers.record(step, time.perf_counter() - start)
+
+    def _spawn(self, record: dict):
+        task = asyncio.get_running_loop().create_task(self.handle(record))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+            print(f"  replay error: {task.exception()!r}")
+
+    async def run(self, records, speed: float) -> int:
+        start = time.perf_counter()
+        events = 0
+        for record in records:
+            if record["e"] == "vc":
+                self.created_vcs[record["c"]] = (record["g"], record["u"])
+                continue
+            if record["e"] == "post":
+                self.created_posts[record["m"]] = (record["g"], record["u"])
+                if record.get("c"):
+                    self.post_vcs[record["c"]] = record["m"]
+                continue
+            if speed:
+                target = start + record["t"] / speed
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.lateness.record(max(0.0, time.perf_counter() - target))
+            self._spawn(record)
+            events += 1
+            if not speed and events % 100 == 0:
+                await asyncio.sleep(0)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        return events
+
+
+async def replay(path: str, speed: float, latency: float, limits: bool, json_out: str = None):
+    records = read_trace(path)
+    header = next(records)
+    if header.get("e") != "header" or header.get("v") != TRACE_VERSION:
+        raise SystemExit(f"{path} is not a version {TRACE_VERSION} event trace")
+    records = list(records)
+    duration = records[-1]["t"] if records else 0.0
+
+    with tempfile.TemporaryDirectory() as workdir:
+        main = import_bot(workdir, header["servers"], header["officer_role_ids"])
+        await main.state_store.open()
+        main.vc_expiry.start()
+        try:
+            rest = FakeRest(latency=latency, limits=None if limits else {}, global_limit=50 if limits else 0)
+            world = build_world(main, rest, header["servers"])
+            replayer = Replayer(main, world, header)
+
+            start = time.perf_counter()
+            events = await replayer.run(records, speed)
+            elapsed = time.perf_counter() - start
+            await drain_background(main)
+        finally:
+            main.vc_expiry.stop()
+            await main.state_store.close()
+
+    errors = main.admin_alerts.pending
+    print(f"{path}: {events} events recorded over {duration:.1f}s replayed in {elapsed:.2f}s "
+          f"({events / elapsed if elapsed else 0:.1f}/s), {replayer.unmapped} unmapped, {errors} handler errors, "
+          f"{replayer.failed} replay errors")
+    if speed:
+        print(f"  dispatch lateness {replayer.lateness.describe()} max={replayer.lateness.max * 1000:.0f}ms")
+    for step, stats in replayer.handlers.steps.items():
+        print(f"  {step:<18} {stats.describe()} max={stats.max * 1000:.0f}ms")
+    print_rest(rest)
+
+    if json_out:
+        rest_stats = rest.stats()
+        with open(json_out, "w") as f:
+            json.dump({
+                "trace": path, "speed": speed, "events": events, "elapsed": elapsed,
+                "unmapped": replayer.unmapped, "errors": errors, "replay_errors": replayer.failed,
+                "lateness": replayer.lateness.summary(),
+                "handlers": {step: stats.summary() for step, stats in replayer.handlers.steps.items()},
+                "rest": {"calls": rest_stats["calls"], "rate_limited": rest_stats["rate_limited"],
+                         "routes": {route: list(counts) for route, counts in rest_stats["routes"].items()}},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier, 0 = as fast as possible")
+    parser.add_argument("--latency", type=float, default=50, help="REST round trip in ms")
+    parser.add_argument("--no-limits", action="store_true", help="disable the stand-in's rate limits")
+    parser.add_argument("--json", dest="json_out", help="write the summary to this file")
+    args = parser.parse_args()
+    asyncio.run(replay(args.trace, args.speed, args.latency / 1000, not args.no_limits, args.json_out))
@@ -0,0 +1,115 @@
+"""
+Stress test for the per-post squad queues.
+
+    python benchmarks/stress_post_actor.py [clicks] [max_players]
+
+Fires `clicks` concurrent Join/Leave clicks (default 1000) at a handful of
+posts, each click arriving after a random delay the way interactions trickle
+in from the gateway. The squad invariant (never more members than
+max_players, no duplicates) is checked after every batch and at the end.
+
+For comparison the same load is run through a check-then-await-then-mutate
+handler, the shape that lets two clicks both see a free slot.
+"""
+import os, sys, time, random, asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lfg_state import LFGState
+from post_actor import PostActors
+
+POSTS = 5
+USERS = 200
+
+
+def check_squad(state: LFGState, msg_id: int):
+    post = state.get_post(msg_id)
+    assert len(post.members) <= post.max_players, f"post {msg_id} overfilled: {len(post.members)}/{post.max_players}"
+    assert len(set(post.members)) == len(post.members), f"post {msg_id} has duplicate members"
+
+
+def make_state(max_players: int) -> LFGState:
+    state = LFGState()
+    for msg_id in range(1, POSTS + 1):
+        state.add_post(msg_id, 1, 10_000 + msg_id, max_players)
+    return state
+
+
+def clicks(n: int):
+    rng = random.Random(42)
+    return [(rng.randint(1, POSTS), rng.randint(1, USERS), rng.random() < 0.7, rng.random() * 0.05)
+            for _ in range(n)]
+
+
+async def run_actors(load, max_players: int):
+    state = make_state(max_players)
+    results = {}
+
+    def on_batch(msg_id, message):
+        check_squad(state, msg_id)
+
+    actors = PostActors(on_batch)
+
+    async def click(msg_id, user_id, join, delay):
+        await asyncio.sleep(delay)
+        if join:
+            def op():
+                result = state.join(msg_id, user_id)
+                return result, result == LFGState.JOINED
+        else:
+            def op():
+                left = state.leave(msg_id, user_id)
+                return left, left
+        result = await actors.submit(msg_id, op, message=object())
+        results[result] = results.get(result, 0) + 1
+        await asyncio.sleep(random.random() * 0.005)  # the interaction response
+
+    start = time.perf_counter()
+    await asyncio.gather(*(click(*c) for c in load))
+    elapsed = time.perf_counter() - start
+    for msg_id in range(1, POSTS + 1):
+        check_squad(state, msg_id)
+    assert actors.queue_depth() == 0 and not actors._mailboxes
+
+    print(f"--- per-post queues ({len(load)} clicks, {POSTS} posts, max {max_players}) ---")
+    print(f"  elapsed {elapsed:.3f}s, results {results}")
+    print(f"  {actors.ops} ops in {actors.batches} batches, {actors.renders} renders "
+          f"(vs {sum(v for k, v in results.items() if k in (LFGState.JOINED, True))} unbatched), "
+          f"{actors.contended} contended, max depth {actors.max_depth}")
+    print(f"  queue wait {actors.wait.describe()}")
+    print(f"  squads: {[len(state.get_post(m).members) for m in range(1, POSTS + 1)]}  -> invariant held")
+
+
+async def run_naive(load, max_players: int):
+    state = make_state(max_players)
+
+    async def click(msg_id, user_id, join, delay):
+        await asyncio.sleep(delay)
+        post = state.get_post(msg_id)
+        if join:
+            if state.in_squad(msg_id, user_id) or post.is_full:
+                return
+            await asyncio.sleep(random.random() * 0.005)  # an await between the check and the write
+            post.members.append(user_id)
+        elif user_id in post.members:
+            await asyncio.sleep(random.random() * 0.005)
+            if user_id in post.members:
+                post.members.remove(user_id)
+
+    await asyncio.gather(*(click(*c) for c in load))
+    overfilled = duplicates = 0
+    for msg_id in range(1, POSTS + 1):
+        members = state.get_post(msg_id).members
+        overfilled += len(members) > max_players
+        duplicates += len(set(members)) != len(members)
+    print("--- check/await/mutate handler (same load) ---")
+    print(f"  squads: {[len(state.get_post(m).members) for m in range(1, POSTS + 1)]}, "
+          f"{overfilled} overfilled, {duplicates} with duplicate members")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    max_players = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    load = clicks(n)
+    asyncio.run(run_actors(load, max_players))
+    asyncio.run(run_naive(load, max_players))
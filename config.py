@@ -0,0 +1,109 @@
+import asyncio, json, os, time, logging
+from routing import VoiceRoutes
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_CHANNEL_KEYS = ("server_id", "alert", "posting", "lfg_category", "join_to_create")
+
+
+# --- Immutable config snapshot ---
+class ConfigSnapshot:
+    """Everything derived from one version of the config file; never mutated after construction."""
+
+    def __init__(self, servers: dict, officer_role_ids, version: int, source_mtime: float = None):
+        self.servers = servers  # {guild_key: {"server_id": ..., "alert": ..., ...}}
+        self.officer_role_ids = frozenset(officer_role_ids)
+        self.routes = VoiceRoutes(servers)
+        self.version = version
+        self.source_mtime = source_mtime
+        self.loaded_at = time.time()
+
+    def server_for_guild(self, guild_id: int):
+        key = self.routes.guild_key(guild_id)
+        return (key, self.servers[key]) if key else (None, None)
+
+
+def parse_config(raw: dict, version: int, source_mtime: float = None) -> ConfigSnapshot:
+    servers = {}
+    seen_guilds = set()
+    seen_join_channels = set()
+    for key, data in (raw.get("servers") or {}).items():
+        missing = [k for k in REQUIRED_CHANNEL_KEYS if k not in data]
+        if missing:
+            raise ValueError(f"server '{key}' is missing {', '.join(missing)}")
+        entry = {k: int(data[k]) for k in REQUIRED_CHANNEL_KEYS}
+        entry["vc_pool_size"] = int(data.get("vc_pool_size", 0))
+        if entry["vc_pool_size"] < 0:
+            raise ValueError(f"server '{key}' has a negative vc_pool_size")
+        if entry["server_id"] in seen_guilds:
+            raise ValueError(f"server '{key}' reuses guild id {entry['server_id']}")
+        if entry["join_to_create"] in seen_join_channels:
+            raise ValueError(f"server '{key}' reuses join_to_create channel {entry['join_to_create']}")
+        seen_guilds.add(entry["server_id"])
+        seen_join_channels.add(entry["join_to_create"])
+        servers[key] = entry
+    officer_role_ids = [int(role_id) for role_id in raw.get("officer_role_ids", [])]
+    return ConfigSnapshot(servers, officer_role_ids, version, source_mtime)
+
+
+# --- Registry with hot reload ---
+class ConfigRegistry:
+    """
+    Holds the current ConfigSnapshot. Reloads build a complete new snapshot
+    off to the side and swap it in with a single assignment, so handlers
+    that read registry.current once per event always see one consistent
+    version. An invalid file is rejected and the previous snapshot stays.
+    on_reload runs after the swap; if it raises, the new snapshot stays
+    current and the error is logged and kept in callback_error.
+    """
+
+    def __init__(self, path: str, on_reload=None):
+        self.path = path
+        self.on_reload = on_reload  # callable(old, new) run after a successful swap
+        self.callback_error = None  # what on_reload raised on the last reload, if anything
+        self.current = self._read(version=1)
+        self._seen_mtime = self.current.source_mtime
+        self._watcher = None
+
+    def _read(self, version: int) -> ConfigSnapshot:
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return parse_config(raw, version, mtime)
+
+    def reload(self) -> ConfigSnapshot:
+        old = self.current
+        new = self._read(version=old.version + 1)
+        self._seen_mtime = new.source_mtime
+        self.current = new
+        logger.info(f"Config reloaded from {self.path}: version {new.version}, {len(new.servers)} servers")
+        self.callback_error = None
+        if self.on_reload:
+            try:
+                self.on_reload(old, new)
+            except Exception as e:
+                # Already swapped in: report it as a failed follow-up, not a rejected config
+                self.callback_error = e
+                logger.error(f"Config version {new.version} applied, but its reload callback failed: {e}")
+        return new
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime != self._seen_mtime:
+                    # Remember it even if the reload fails, so a broken file isn't retried every tick
+                    self._seen_mtime = mtime
+                    self.reload()
+            except Exception as e:
+                logger.error(f"Config reload from {self.path} rejected, keeping version {self.current.version}: {e}")
+
+    def start_watching(self, interval: float = 5.0):
+        if interval > 0 and (self._watcher is None or self._watcher.done()):
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    def stop_watching(self):
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
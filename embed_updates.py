@@ -0,0 +1,109 @@
+import discord
+import asyncio, time, logging
+from rest_priority import scheduler as rest, COSMETIC
+
+logger = logging.getLogger(__name__)
+
+
+# --- Per-channel edit bucket ---
+class ChannelBucket:
+    """Local mirror of Discord's message edit bucket (5 edits per 5s per channel)."""
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+# --- Embed update scheduler ---
+class EmbedUpdateScheduler:
+    """
+    Debounces embed edits per message. Requests made while an edit is pending
+    collapse into one msg.edit, and the embed is rendered at flush time so the
+    latest squad state always wins. A render that returns None skips the edit.
+    """
+
+    def __init__(self, debounce: float = 0.5, rate: int = 5, per: float = 5.0):
+        self.debounce = debounce
+        self.rate = rate
+        self.per = per
+        self._pending = {}  # {msg.id: (discord.Message, render)}
+        self._tasks = {}  # {msg.id: asyncio.Task}
+        self._buckets = {}  # {channel.id: ChannelBucket}
+        self.requested = 0
+        self.edits_sent = 0
+        self.edits_saved = 0
+        self.edits_failed = 0
+
+    def request(self, msg: discord.Message, render):
+        self.requested += 1
+        if msg.id in self._pending:
+            self.edits_saved += 1
+        self._pending[msg.id] = (msg, render)
+        if msg.id not in self._tasks:
+            self._tasks[msg.id] = asyncio.get_running_loop().create_task(self._flush(msg.id, msg.channel.id))
+
+    def is_pending(self, msg_id: int) -> bool:
+        return msg_id in self._pending
+
+    def cancel(self, msg_id: int):
+        if self._pending.pop(msg_id, None):
+            self.edits_saved += 1
+        task = self._tasks.pop(msg_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def _flush(self, msg_id: int, channel_id: int):
+        try:
+            while msg_id in self._pending:
+                await asyncio.sleep(self.debounce)
+                bucket = self._buckets.get(channel_id)
+                if bucket is None:
+                    bucket = self._buckets[channel_id] = ChannelBucket(self.rate, self.per)
+                wait = bucket.delay()
+                while wait:
+                    await asyncio.sleep(wait)
+                    wait = bucket.delay()
+                entry = self._pending.pop(msg_id, None)
+                if entry is None:
+                    break
+                msg, render = entry
+                try:
+                    embed = render()
+                    if embed is None:
+                        continue  # nothing left to show, e.g. the post was deleted meanwhile
+                    bucket.consume()
+                    # Cosmetic: yields to moves and VC creation waiting on the same REST budget
+                    await rest.run(COSMETIC, msg.edit(embed=embed))
+                    self.edits_sent += 1
+                except discord.NotFound:
+                    self._pending.pop(msg_id, None)
+                except Exception as e:
+                    self.edits_failed += 1
+                    logger.error(f"Embed update failed for message {msg_id}: {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._tasks.get(msg_id) is asyncio.current_task():
+                self._tasks.pop(msg_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "edits_sent": self.edits_sent,
+            "edits_saved": self.edits_saved,
+            "edits_failed": self.edits_failed,
+            "pending": len(self._pending),
+        }
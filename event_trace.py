@@ -0,0 +1,127 @@
+import asyncio, gzip, json, time, logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+_COMPACT = (",", ":")
+
+
+def open_trace(path: str, mode: str):
+    # A .gz path is compressed; appended batches become gzip members, which readers handle transparently
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_trace(path: str):
+    with open_trace(path, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# --- Event trace recorder ---
+class TraceRecorder:
+    """
+    Captures what the LFG handlers consume as one compact JSON line per event:
+    voice state updates, interactions, and the ids of VCs and posts the bot
+    created in response (so a replay can map them onto its own). Lines are
+    buffered in memory and appended on a worker thread every flush_interval
+    seconds, so recording never blocks the loop on disk. The thread is the
+    recorder's own single worker, so batches are written in order and a
+    slow flush never overlaps the next one.
+
+    Record keys: t seconds since start, e event, g guild, u user, b/a channel
+    before/after, k interaction kind, c custom_id or channel, m message,
+    v modal values, o officer.
+    """
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.path = None
+        self.events = 0
+        self._buffer = []
+        self._started = None
+        self._task = None
+        self._executor = None
+
+    @property
+    def active(self) -> bool:
+        return self.path is not None
+
+    def start(self, path: str, header: dict):
+        if self.active:
+            return
+        self.path = path
+        self.events = 0
+        self._started = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-trace")
+        self._buffer.append(json.dumps({"e": "header", "v": TRACE_VERSION, "started": time.time(), **header},
+                                       separators=_COMPACT))
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Event trace recording to {path}")
+
+    def _emit(self, record: dict):
+        record["t"] = round(time.monotonic() - self._started, 4)
+        self._buffer.append(json.dumps(record, separators=_COMPACT))
+        self.events += 1
+
+    # --- Capture points (no-ops while inactive) ---
+    def voice(self, guild_id: int, user_id: int, before_id: int, after_id: int):
+        if self.active:
+            self._emit({"e": "voice", "g": guild_id, "u": user_id, "b": before_id, "a": after_id})
+
+    def interaction(self, guild_id: int, user_id: int, kind: str, custom_id: str, message_id: int = None,
+                    values: list = None, officer: bool = False):
+        if self.active:
+            record = {"e": "interaction", "g": guild_id, "u": user_id, "k": kind, "c": custom_id}
+            if message_id is not None:
+                record["m"] = message_id
+            if values:
+                record["v"] = values
+            if officer:
+                record["o"] = 1
+            self._emit(record)
+
+    def created_vc(self, guild_id: int, owner_id: int, vc_id: int):
+        if self.active:
+            self._emit({"e": "vc", "g": guild_id, "u": owner_id, "c": vc_id})
+
+    def created_post(self, guild_id: int, host_id: int, msg_id: int, vc_id: int):
+        if self.active:
+            self._emit({"e": "post", "g": guild_id, "u": host_id, "m": msg_id, "c": vc_id})
+
+    # --- Writing ---
+    def _write(self, path: str, lines: list):
+        with open_trace(path, "at") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self):
+        if not self._buffer or self.path is None:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, self.path, lines)
+        except Exception as e:
+            logger.error(f"Event trace write to {self.path} failed, dropped {len(lines)} lines: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def stop(self):
+        if not self.active:
+            return
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        logger.info(f"Event trace stopped: {self.events} events in {self.path}")
+        self.path = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "events": self.events, "buffered": len(self._buffer)}
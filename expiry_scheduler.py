@@ -0,0 +1,128 @@
+import asyncio, heapq, itertools, logging
+
+logger = logging.getLogger(__name__)
+
+
+# --- Heap-based expiry scheduler ---
+class ExpiryScheduler:
+    """
+    One driver coroutine for any number of deadlines. Rescheduling pushes a
+    new heap entry (O(log n)) and cancelling just forgets the key (O(1));
+    stale heap entries are skipped when popped and compacted when they pile
+    up. Keys that expire together are handed to on_expire as one batch.
+    """
+
+    def __init__(self, on_expire, batch_window: float = 0.05):
+        self.on_expire = on_expire  # async callable taking a list of keys
+        self.batch_window = batch_window
+        self._heap = []  # [(deadline, seq, key)]
+        self._deadlines = {}  # {key: (deadline, seq)} live entries only
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._driver = None
+        self._dispatches = set()  # in-flight on_expire calls, referenced until they finish
+        self.expired = 0
+        self.batches = 0
+
+    # --- Scheduling ---
+    def schedule(self, key, delay: float):
+        deadline = self._now() + delay
+        seq = next(self._seq)
+        self._deadlines[key] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+        self._maybe_compact()
+
+    def cancel(self, key) -> bool:
+        return self._deadlines.pop(key, None) is not None
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    # --- Introspection ---
+    @property
+    def pending(self) -> int:
+        return len(self._deadlines)
+
+    def deadline(self, key) -> float:
+        entry = self._deadlines.get(key)
+        return entry[0] if entry else None
+
+    def items(self):
+        """(key, deadline) for every live entry."""
+        return [(key, deadline) for key, (deadline, _) in self._deadlines.items()]
+
+    def next_deadline(self) -> float:
+        """Seconds until the earliest live deadline, or None when idle."""
+        self._drop_stale_head()
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._now())
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "heap_size": len(self._heap),
+            "next_deadline": self.next_deadline(),
+            "expired": self.expired,
+            "batches": self.batches,
+        }
+
+    # --- Driver ---
+    def start(self):
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._driver:
+            self._driver.cancel()
+            self._driver = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            wait = self.next_deadline()
+            if wait is None or wait > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Collect everything due now (plus a small window) into one batch
+            cutoff = self._now() + self.batch_window
+            batch = []
+            while self._heap and self._heap[0][0] <= cutoff:
+                deadline, seq, key = heapq.heappop(self._heap)
+                if self._deadlines.get(key) == (deadline, seq):
+                    del self._deadlines[key]
+                    batch.append(key)
+            if batch:
+                self.expired += len(batch)
+                self.batches += 1
+                task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list):
+        try:
+            await self.on_expire(batch)
+        except Exception as e:
+            logger.error(f"Expiry callback failed for {len(batch)} keys: {e}")
+
+    # --- Internals ---
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _drop_stale_head(self):
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            if self._deadlines.get(key) == (deadline, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self):
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._deadlines):
+            self._heap = [(d, s, k) for k, (d, s) in self._deadlines.items()]
+            heapq.heapify(self._heap)
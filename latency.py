@@ -0,0 +1,107 @@
+import time, heapq
+from collections import deque
+
+
+# --- Latency tracking ---
+class LatencyStats:
+    """Count/total/max plus a bounded window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 512):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.mean * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+    def describe(self) -> str:
+        s = self.summary()
+        return f"n={s['count']} mean={s['mean_ms']:.0f}ms p50={s['p50_ms']:.0f}ms p99={s['p99_ms']:.0f}ms"
+
+
+# --- Per-step latency ---
+class StepLatency:
+    """LatencyStats per named step of a multi-step flow."""
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self.steps = {}  # {step name: LatencyStats}
+
+    def record(self, step: str, seconds: float):
+        stats = self.steps.get(step)
+        if stats is None:
+            stats = self.steps[step] = LatencyStats(self.window)
+        stats.record(seconds)
+
+    async def track(self, step: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(step, time.perf_counter() - start)
+
+    def describe(self) -> str:
+        return "\n".join(f"{step}: {stats.describe()}" for step, stats in self.steps.items()) or "no samples"
+
+
+# --- Slowest recent samples ---
+class SlowestLog:
+    """
+    The `keep` slowest samples across all names from roughly the last one
+    to two `horizon`s. Samples go into a small min-heap per generation and
+    the older generation is dropped every horizon, so an old spike ages out
+    without tracking per-sample expiry.
+    """
+
+    def __init__(self, keep: int = 20, horizon: float = 900):
+        self.keep = keep
+        self.horizon = horizon
+        self._current = []  # min-heap of (seconds, at, name, detail)
+        self._previous = []
+        self._rotated = time.time()
+
+    def _rotate(self, now: float):
+        if now - self._rotated >= self.horizon:
+            self._previous, self._current = self._current, []
+            self._rotated = now
+
+    def qualifies(self, seconds: float) -> bool:
+        """Whether a sample this slow would be kept; lets callers skip building its detail."""
+        return len(self._current) < self.keep or seconds > self._current[0][0]
+
+    def record(self, name: str, seconds: float, detail: str = ""):
+        now = time.time()
+        self._rotate(now)
+        entry = (seconds, now, name, detail)
+        if len(self._current) < self.keep:
+            heapq.heappush(self._current, entry)
+        elif seconds > self._current[0][0]:
+            heapq.heapreplace(self._current, entry)
+
+    def slowest(self, n: int = None) -> list:
+        self._rotate(time.time())
+        return heapq.nlargest(n or self.keep, self._current + self._previous)
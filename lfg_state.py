@@ -0,0 +1,264 @@
+import heapq
+from array import array
+
+
+# --- LFG post record ---
+class Post:
+    # Plain ints and strings only: no discord objects are pinned by an open post
+    __slots__ = ("msg_id", "guild_id", "host_id", "max_players", "vc_id", "channel_id", "members",
+                 "title", "host_name")
+
+    def __init__(self, msg_id: int, guild_id: int, host_id: int, max_players: int,
+                 vc_id: int = None, channel_id: int = None, title: str = "", host_name: str = ""):
+        self.msg_id = msg_id
+        self.guild_id = guild_id
+        self.host_id = host_id
+        self.max_players = max_players
+        self.vc_id = vc_id
+        self.channel_id = channel_id
+        self.members = array("Q")  # user ids in join order
+        self.title = title  # what the embed is rendered from; empty for posts restored from an older database
+        self.host_name = host_name
+
+    @property
+    def is_full(self) -> bool:
+        return self.max_players != 0 and len(self.members) >= self.max_players
+
+    @property
+    def remaining(self) -> int:
+        return UNLIMITED if self.max_players == 0 else self.max_players - len(self.members)
+
+
+UNLIMITED = 1 << 31  # remaining slots reported by posts with no player cap
+
+
+# --- Open squad index ---
+class OpenSquadIndex:
+    """
+    One guild's open posts in a heap keyed by (remaining slots, newest first),
+    so the squad closest to full is found in O(log n). Membership changes push
+    a fresh entry instead of updating in place; entries whose slot count no
+    longer matches their post (or whose post is gone, full, or has lost its
+    voice channel) are dropped when they surface, and the heap is rebuilt
+    once they pile up.
+    """
+
+    def __init__(self):
+        self._heap = []  # [(remaining, -msg_id)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, post: Post):
+        if not post.is_full and post.vc_id is not None:
+            heapq.heappush(self._heap, (post.remaining, -post.msg_id))
+
+    def best(self, posts: dict, skip) -> Post:
+        # skip(post) -> True for a live post this caller can't take (e.g. already in it); kept in the heap
+        skipped = []
+        found = None
+        while self._heap:
+            remaining, neg_id = self._heap[0]
+            post = posts.get(-neg_id)
+            if post is None or post.is_full or post.vc_id is None or post.remaining != remaining:
+                heapq.heappop(self._heap)
+            elif skip(post):
+                skipped.append(heapq.heappop(self._heap))
+            else:
+                found = post
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def rebuild(self, posts):
+        self._heap = [(post.remaining, -post.msg_id) for post in posts if not post.is_full and post.vc_id is not None]
+        heapq.heapify(self._heap)
+
+
+# --- Indexed in-memory state ---
+class LFGState:
+    """
+    All LFG/VC bookkeeping behind bidirectional indexes so joins, leaves,
+    deletes and owner lookups are O(1) and deleting a post or VC cascades
+    through every index that references it.
+    """
+
+    JOINED, ALREADY, FULL, MISSING = "joined", "already", "full", "missing"
+
+    def __init__(self):
+        self.posts = {}  # {msg_id: Post}
+        self.guild_posts = {}  # {guild_id: {msg_id}}
+        self.member_posts = {}  # {user.id: {msg_id}}
+        self.host_posts = {}  # {user.id: {msg_id}}
+        self.vc_post = {}  # {vc.id: msg_id}
+        self.managed_vcs = set()  # {vc.id}
+        self.vc_owner = {}  # {vc.id: user.id} join-to-create VCs
+        self.owner_vc = {}  # {user.id: vc.id} join-to-create VCs
+        self.open_squads = {}  # {guild_id: OpenSquadIndex}
+
+    # --- Posts ---
+    def add_post(self, msg_id: int, guild_id: int, host_id: int, max_players: int,
+                 vc_id: int = None, channel_id: int = None, title: str = "", host_name: str = "") -> Post:
+        post = Post(msg_id, guild_id, host_id, max_players, vc_id, channel_id, title, host_name)
+        self.posts[msg_id] = post
+        self.guild_posts.setdefault(guild_id, set()).add(msg_id)
+        self.host_posts.setdefault(host_id, set()).add(msg_id)
+        if vc_id is not None:
+            self.vc_post[vc_id] = msg_id
+        self._index_open(post)
+        return post
+
+    def get_post(self, msg_id: int) -> Post:
+        return self.posts.get(msg_id)
+
+    def remove_post(self, msg_id: int) -> Post:
+        post = self.posts.pop(msg_id, None)
+        if post is None:
+            return None
+        _discard(self.guild_posts, post.guild_id, msg_id)
+        _discard(self.host_posts, post.host_id, msg_id)
+        for user_id in post.members:
+            _discard(self.member_posts, user_id, msg_id)
+        if post.vc_id is not None and self.vc_post.get(post.vc_id) == msg_id:
+            del self.vc_post[post.vc_id]
+        if post.guild_id not in self.guild_posts:
+            self.open_squads.pop(post.guild_id, None)
+        return post
+
+    def has_active_post(self, user_id: int) -> bool:
+        return user_id in self.host_posts
+
+    def guild_post_ids(self, guild_id: int) -> set:
+        return self.guild_posts.get(guild_id, set())
+
+    # --- Squads ---
+    # Membership is answered by the member_posts index, so the array is only scanned on leave
+    def join(self, msg_id: int, user_id: int) -> str:
+        post = self.posts.get(msg_id)
+        if post is None:
+            return self.MISSING
+        if self.in_squad(msg_id, user_id):
+            return self.ALREADY
+        if post.is_full:
+            return self.FULL
+        post.members.append(user_id)
+        self.member_posts.setdefault(user_id, set()).add(msg_id)
+        self._index_open(post)
+        return self.JOINED
+
+    def leave(self, msg_id: int, user_id: int) -> bool:
+        post = self.posts.get(msg_id)
+        if post is None or not self.in_squad(msg_id, user_id):
+            return False
+        post.members.remove(user_id)
+        _discard(self.member_posts, user_id, msg_id)
+        self._index_open(post)
+        return True
+
+    def in_squad(self, msg_id: int, user_id: int) -> bool:
+        return msg_id in self.member_posts.get(user_id, ())
+
+    # --- Quick Join ---
+    def _index_open(self, post: Post):
+        index = self.open_squads.get(post.guild_id)
+        if index is None:
+            index = self.open_squads[post.guild_id] = OpenSquadIndex()
+        index.push(post)
+        live = self.guild_posts.get(post.guild_id, ())
+        if len(index) > 64 and len(index) > 2 * len(live):
+            index.rebuild(self.posts[msg_id] for msg_id in live)
+
+    def best_open_post(self, guild_id: int, user_id: int) -> Post:
+        # Fewest free slots first (finish squads that are nearly ready), newest post on ties
+        index = self.open_squads.get(guild_id)
+        if index is None:
+            return None
+        return index.best(self.posts, lambda post: self.in_squad(post.msg_id, user_id))
+
+    # --- Managed VCs ---
+    def add_vc(self, vc_id: int, owner_id: int = None):
+        self.managed_vcs.add(vc_id)
+        if owner_id is not None:
+            self.vc_owner[vc_id] = owner_id
+            self.owner_vc[owner_id] = vc_id
+
+    def is_managed(self, vc_id: int) -> bool:
+        return vc_id in self.managed_vcs
+
+    def owned_vc(self, user_id: int) -> int:
+        return self.owner_vc.get(user_id)
+
+    def remove_vc(self, vc_id: int) -> int:
+        # Returns the msg_id of the LFG post that used this VC, if any; the caller decides what happens to it
+        self.managed_vcs.discard(vc_id)
+        owner_id = self.vc_owner.pop(vc_id, None)
+        if owner_id is not None and self.owner_vc.get(owner_id) == vc_id:
+            del self.owner_vc[owner_id]
+        msg_id = self.vc_post.pop(vc_id, None)
+        if msg_id is not None and msg_id in self.posts:
+            self.posts[msg_id].vc_id = None
+            return msg_id
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "posts": len(self.posts),
+            "squad_members": sum(len(s) for s in self.member_posts.values()),
+            "managed_vcs": len(self.managed_vcs),
+            "join_create_vcs": len(self.vc_owner),
+            "open_squad_entries": sum(len(index) for index in self.open_squads.values()),
+        }
+
+
+def _discard(index: dict, key: int, value: int):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.discard(value)
+        if not bucket:
+            del index[key]
+
+
+# --- Shard partitioning ---
+def shard_for(guild_id: int, shard_count: int) -> int:
+    # Discord's own guild -> shard mapping
+    return (guild_id >> 22) % shard_count
+
+
+class ShardedLFGState:
+    """
+    One LFGState per gateway shard. Every guild maps to exactly one shard,
+    so a shard's events only ever touch its own partition, and a process
+    running a subset of shards only holds state for the guilds it serves.
+    """
+
+    def __init__(self, shard_count: int = 1, shard_ids=None):
+        self.shard_count = max(1, shard_count)
+        self.partitions = {shard_id: LFGState() for shard_id in (shard_ids or range(self.shard_count))}
+
+    def shard_id(self, guild_id: int) -> int:
+        return shard_for(guild_id, self.shard_count)
+
+    def owns(self, guild_id: int) -> bool:
+        return self.shard_id(guild_id) in self.partitions
+
+    def for_guild(self, guild_id: int) -> LFGState:
+        shard_id = self.shard_id(guild_id)
+        partition = self.partitions.get(shard_id)
+        if partition is None:
+            partition = self.partitions[shard_id] = LFGState()
+        return partition
+
+    def iter_posts(self):
+        for partition in self.partitions.values():
+            yield from partition.posts.values()
+
+    def stats(self) -> dict:
+        totals = {}
+        for partition in self.partitions.values():
+            for key, value in partition.stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def shard_stats(self) -> dict:
+        return {shard_id: partition.stats() for shard_id, partition in self.partitions.items()}
@@ -0,0 +1,96 @@
+import logging, logging.handlers, queue, atexit
+
+LOG_FORMAT = "[%(asctime)s] [%(levelname)-8s] %(name)s: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+NOISY_LOGGERS = ("discord.gateway", "discord.http")
+
+
+# --- Payload sampling ---
+class PayloadSampler(logging.Filter):
+    """
+    Keeps 1 in every sample_rate DEBUG records from the gateway/http loggers
+    and truncates the ones it keeps. Runs before the record is queued, so
+    dropped payloads are never formatted.
+    """
+
+    def __init__(self, sample_rate: int = 10, max_chars: int = 500, prefixes=NOISY_LOGGERS):
+        super().__init__()
+        self.sample_rate = max(1, sample_rate)
+        self.max_chars = max_chars
+        self.prefixes = tuple(prefixes)
+        self.seen = 0
+        self.dropped = 0
+        self.truncated = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not record.name.startswith(self.prefixes):
+            return True
+        self.seen += 1
+        if self.seen % self.sample_rate:
+            self.dropped += 1
+            return False
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            record.msg = f"{message[:self.max_chars]}... [{len(message) - self.max_chars} chars truncated]"
+            record.args = None
+            self.truncated += 1
+        return True
+
+
+def parse_levels(spec: str) -> dict:
+    """'discord.gateway=INFO,discord.http=WARNING' -> {logger name: level}"""
+    levels = {}
+    for part in (spec or "").split(","):
+        name, _, level = part.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+# --- Queued, rotating file logging ---
+def setup_logging(filename: str = "discord.log", level: str = "DEBUG", levels: dict = None,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, rotate_when: str = None,
+                  sample_rate: int = 10, max_chars: int = 500) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a QueueHandler so file I/O happens on the
+    QueueListener's thread instead of the event loop. Files rotate by size,
+    or by time when rotate_when is set (e.g. "midnight").
+    """
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            filename, when=rotate_when, backupCount=backup_count, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT, style="%"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(PayloadSampler(sample_rate, max_chars))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
+
+
+def stop_logging(listener: logging.handlers.QueueListener):
+    # Safe to call twice (explicit stop, then atexit)
+    if listener._thread is not None:
+        listener.stop()
+
+
+def payload_sampler() -> PayloadSampler:
+    for handler in logging.getLogger().handlers:
+        for f in handler.filters:
+            if isinstance(f, PayloadSampler):
+                return f
+    return None
@@ -0,0 +1,119 @@
+import asyncio, time, logging
+from collections import deque
+import metrics
+from latency import SlowestLog
+
+logger = logging.getLogger(__name__)
+
+slow_callback_total = metrics.registry.counter(
+    "lfg_slow_callbacks_total", "Event loop callbacks that ran longer than the slow-callback threshold")
+
+
+# --- Event loop lag ---
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up; that delay is time the loop spent busy elsewhere."""
+
+    def __init__(self, interval: float = 0.5, window: int = 120, stall_threshold: float = 0.25):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.recent = deque(maxlen=window)
+        self.stalls = 0  # ticks that woke up at least stall_threshold late
+        self.last_stall = 0.0  # wall time of the latest stall
+        self.last_tick = 0.0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+            self.recent.append(self.lag)
+            self.last_tick = time.time()
+            if self.lag >= self.stall_threshold:
+                self.stalls += 1
+                self.last_stall = self.last_tick
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        recent = sorted(self.recent)
+        return {
+            "lag_ms": self.lag * 1000,
+            "p99_ms": recent[int(len(recent) * 0.99)] * 1000 if recent else 0.0,
+            "max_ms": self.max_lag * 1000,
+            "stalls": self.stalls,
+        }
+
+
+# --- Slow callbacks ---
+def describe_callback(handle: asyncio.Handle) -> str:
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f"task {task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class SlowCallbackMonitor:
+    """
+    Times every event loop callback (each task step, timer and I/O callback)
+    and reports the ones that hold the loop for `threshold` seconds or more:
+    asyncio's own debug-mode slow-callback warning, without the rest of
+    debug mode's overhead. A task step is reported under the task's
+    coroutine, so the handler that blocked is named directly. Installed by
+    wrapping asyncio.Handle._run, which costs two clock reads per callback.
+    """
+
+    def __init__(self, threshold: float = 0.1, keep: int = 20):
+        self.threshold = threshold
+        self.count = 0
+        self.slowest = SlowestLog(keep=keep)
+        self._original = None
+
+    def install(self):
+        if self._original is not None or self.threshold <= 0:
+            return
+        original = self._original = asyncio.Handle._run
+        monitor = self
+
+        def _run(handle):
+            start = time.perf_counter()
+            try:
+                original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                if elapsed >= monitor.threshold:
+                    monitor.report(handle, elapsed)
+
+        asyncio.Handle._run = _run
+
+    def uninstall(self):
+        if self._original is not None:
+            asyncio.Handle._run = self._original
+            self._original = None
+
+    def report(self, handle: asyncio.Handle, elapsed: float):
+        self.count += 1
+        slow_callback_total.inc()
+        name = describe_callback(handle)
+        self.slowest.record(name, elapsed)
+        logger.warning(f"Slow event loop callback: {name} blocked the loop for {elapsed * 1000:.0f}ms")
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "count": self.count,
+            "slowest": [{"name": name, "ms": seconds * 1000, "at": at} for seconds, at, name, _ in self.slowest.slowest(5)],
+        }
@@ -1,104 +1,309 @@
 import discord
 from discord.ext import commands
-import asyncio, os, logging
+import asyncio, io, os, time, logging
 from dotenv import load_dotenv
 import webserver
+import metrics
+from alerts import AdminAlerts
+from embed_updates import EmbedUpdateScheduler
+from state_store import StateStore
+from lfg_state import LFGState, ShardedLFGState
+from expiry_scheduler import ExpiryScheduler
+from routing import route_voice_event
+from config import ConfigRegistry
+from vc_pool import VoicePool
+from latency import StepLatency
+from loop_monitor import LoopLagMonitor, SlowCallbackMonitor
+from profiler import StackSampler
+from logging_setup import setup_logging, parse_levels, payload_sampler
+from event_trace import TraceRecorder
+from reconcile import Reconciler
+from throttle import Throttle, BucketMap
+from post_actor import PostActors
+from post_embed import PostEmbeds, new_post_embed
+from rest_priority import USER, BACKGROUND, COSMETIC
+import rest_priority
 
 # --- Load token ---
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 
 # --- Logging ---
-logging.basicConfig(level=logging.DEBUG, filename='discord.log', encoding='utf-8', filemode='w')
+# Queued so file writes happen off the event loop; gateway/http DEBUG payloads are sampled and truncated
+log_listener = setup_logging(
+    filename=os.getenv("LOG_FILE", "discord.log"),
+    level=os.getenv("LOG_LEVEL", "DEBUG"),
+    levels=parse_levels(os.getenv("LOG_LEVELS", "")),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+    backup_count=int(os.getenv("LOG_BACKUPS", 5)),
+    rotate_when=os.getenv("LOG_ROTATE_WHEN"),
+    sample_rate=int(os.getenv("LOG_SAMPLE_RATE", 10)),
+    max_chars=int(os.getenv("LOG_PAYLOAD_CHARS", 500))
+)
 logger = logging.getLogger(__name__)
+logging.getLogger("discord.http").addFilter(metrics.RateLimitCounter())
+
+# --- Sharding ---
+# SHARD_COUNT=N runs an AutoShardedBot; SHARD_IDS="0-3" or "0,2" limits this process to those shards
+# so several processes can split one bot. Unset (or 0) keeps the single unsharded connection.
+def parse_shard_ids(spec: str) -> list:
+    shard_ids = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    return shard_ids
+
+
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0))
+SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS", "")) or None
+BotBase = commands.AutoShardedBot if SHARD_COUNT else commands.Bot
 
 # --- Intents & Bot ---
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 intents.voice_states = True
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# --- Servers & Channels ---
-SERVERS = {
-    "main": {
-        "server_id": 911035631193444412,
-        "alert": 1414759057121873950,
-        "posting": 1414497675667308564,
-        "lfg_category": 1414750850701721703,
-        "join_to_create": 1413590729942503474
-    },
-    "test": {
-        "server_id": 1412815561477459991,
-        "alert": 1413526136951935066,
-        "posting": 1413526066198216775,
-        "lfg_category": 1413532598378172548,
-        "join_to_create": 1413556559883276380
-    }
-}
 
-# --- Roles & Officers ---
+# --- Member cache policy ---
+# "full": discord.py default, every member of every guild cached and chunked at startup.
+# "lean": only members currently in voice are cached; squads hold plain user ids and need no members.
+MEMBER_CACHE_MODE = os.getenv("MEMBER_CACHE", "full").lower()
+if MEMBER_CACHE_MODE == "lean":
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.voice = True
+    chunk_guilds_at_startup = False
+else:
+    member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+    chunk_guilds_at_startup = True
+
+
+class LFGBot(BotBase):
+    async def setup_hook(self):
+        await state_store.open()
+        vc_expiry.start()
+        vc_pool.start()
+        metrics.registry.start()
+        loop_lag.start()
+        slow_callbacks.install()
+        admin_alerts.start()
+        config.start_watching(CONFIG_WATCH_INTERVAL)
+        await webserver.start(self, port=int(os.getenv("PORT", 8080)), lag_monitor=loop_lag, state_dump=dump_state)
+
+    async def close(self):
+        await webserver.stop()
+        await tracer.stop()
+        config.stop_watching()
+        reconciler.stop()
+        vc_expiry.stop()
+        vc_pool.stop()
+        metrics.registry.stop()
+        loop_lag.stop()
+        slow_callbacks.uninstall()
+        await admin_alerts.stop()
+        await state_store.close()
+        await super().close()
+
+
+shard_options = {"shard_count": SHARD_COUNT, "shard_ids": SHARD_IDS} if SHARD_COUNT else {}
+bot = LFGBot(command_prefix="!", intents=intents, member_cache_flags=member_cache_flags,
+             chunk_guilds_at_startup=chunk_guilds_at_startup, **shard_options)
+
+# --- Servers, Channels & Officer Roles ---
+# Loaded from SERVERS_CONFIG (servers.json); reloaded with !reload_config or when the file changes.
+# Handlers read config.current once per event so a reload never mixes two versions.
+def on_config_reload(old, new):
+    if bot.is_ready():
+        for key, data in new.servers.items():
+            before = old.servers.get(key)
+            if before is None or before["vc_pool_size"] != data["vc_pool_size"]:
+                warm_vc_pool(data)
+        for key in new.servers.keys() - old.servers.keys():
+            bot.add_view(DeployLFGButtonView(key))
+
+
+config = ConfigRegistry(os.getenv("SERVERS_CONFIG", "servers.json"), on_reload=on_config_reload)
+CONFIG_WATCH_INTERVAL = float(os.getenv("CONFIG_WATCH_INTERVAL", 5))  # 0 = only reload on command
+
+# --- Owner ---
 BOT_OWNER_ID = 441386174670438401
-OFFICER_ROLE_IDS = [
-    1412827215002861608, 1173706633084403762, 1176539066569871531,
-    911755541020311553, 1413165455421734985
-]
+
+# Deduplicated, rate-capped digest of admin alerts (see dm_admin)
+admin_alerts = AdminAlerts(bot, BOT_OWNER_ID, digest_interval=30, max_per_hour=20)
 
 # --- In-memory storage ---
-squads = {}  # {guild_id: {msg_id: [discord.Member, ...]}}
-managed_vcs = set()  # {vc.id}
-vc_inactivity_tasks = {}  # {vc.id: asyncio.Task}
-user_active_lfg = {}  # {user.id: msg_id}
-user_join_create = {}  # {user.id: vc.id}
+# Posts, squads, managed VCs and join-to-create owners, one LFGState partition per shard
+state = ShardedLFGState(SHARD_COUNT or 1, SHARD_IDS)
+embed_updates = EmbedUpdateScheduler(debounce=0.5)
+post_embeds = PostEmbeds()
+
+# --- Persistent storage ---
+state_store = StateStore(os.getenv("STATE_DB", "lfg_state.db"))
+first_ready = True
+
+# --- Join-to-create VC pool ---
+vc_pool = VoicePool()
+
+# --- Throttling ---
+# Every join-to-create entry and modal submit spends a channel create; cap what one user, and one guild, can burn
+join_throttle = Throttle("join_to_create", user_rate=3, user_per=60, guild_rate=20, guild_per=10)
+submit_throttle = Throttle("lfg_submit", user_rate=2, user_per=60, guild_rate=10, guild_per=10)
+throttle_notices = BucketMap(1, 60)  # at most one "slow down" DM per user per minute
+
+# --- Crash leftovers ---
+# Swept once at startup and every RECONCILE_INTERVAL seconds (0 = startup only).
+# RECONCILE_POSTS=delete removes stale LFG posts instead of stripping their buttons.
+reconciler = Reconciler(concurrency=4, archive_posts=os.getenv("RECONCILE_POSTS", "archive") != "delete")
+RECONCILE_INTERVAL = float(os.getenv("RECONCILE_INTERVAL", 1800))
+
+# --- Outbound REST priority ---
+# Moves and VC creation members are waiting on run as USER; inactivity deletes and refresh edits as
+# BACKGROUND; embed re-renders as COSMETIC. Interaction responses bypass it: they aren't
+# counted against the bot's global REST limit.
+rest = rest_priority.scheduler
+
+# --- Event trace capture ---
+# TRACE_FILE=path (.gz compresses) records from startup; !trace on/off toggles it at runtime.
+# Replay a trace against the offline stand-in with benchmarks/replay_trace.py.
+tracer = TraceRecorder()
+
+# --- Metrics & health ---
+loop_lag = LoopLagMonitor()
+metrics.registry.gauge("lfg_loop_lag_seconds", "How late the loop lag monitor's last tick woke up", lambda: loop_lag.lag)
+
+# --- Profiling ---
+# Callbacks holding the loop for SLOW_CALLBACK_MS or more are logged (0 = off); !perf shows the slowest
+# recent callbacks and handlers, and `!perf N` samples the loop thread's stacks for N seconds.
+slow_callbacks = SlowCallbackMonitor(threshold=float(os.getenv("SLOW_CALLBACK_MS", 100)) / 1000)
+profiler = StackSampler()
+PROFILE_MAX_SECONDS = 60
+metrics.registry.gauge("lfg_active_squads", "Open LFG posts", lambda: state.stats().get("posts", 0))
+metrics.registry.gauge("lfg_managed_vcs", "Voice channels managed by the bot", lambda: state.stats().get("managed_vcs", 0))
+metrics.registry.gauge(
+    "lfg_shard_active_squads", "Open LFG posts per shard",
+    lambda: {(shard_id,): stats["posts"] for shard_id, stats in state.shard_stats().items()}, ("shard",)
+)
+metrics.registry.gauge(
+    "lfg_shard_latency_seconds", "Gateway heartbeat latency per shard",
+    lambda: {(shard_id,): latency for shard_id, latency in getattr(bot, "latencies", [])
+             if latency == latency and latency != float("inf")}, ("shard",)
+)
+shard_events = metrics.registry.counter("lfg_shard_events_total", "Gateway events handled per shard", ("shard", "event"))
+metrics.registry.gauge("lfg_inactivity_timers_pending", "VC inactivity deadlines pending", lambda: vc_expiry.pending)
+metrics.registry.gauge("lfg_embed_edits_saved", "Embed edits avoided by coalescing", lambda: embed_updates.edits_saved)
+metrics.registry.gauge(
+    "lfg_throttle_buckets", "Live per-user/per-guild throttle buckets",
+    lambda: {(t.action,): len(t.users) + len(t.guilds) for t in (join_throttle, submit_throttle)}, ("action",)
+)
+metrics.registry.gauge("lfg_post_actor_queue_depth", "Squad mutations queued across all posts",
+                       lambda: post_actors.queue_depth())
+metrics.registry.gauge("lfg_vc_pool_idle", "Idle pre-created join-to-create VCs", lambda: vc_pool.idle_count())
+metrics.registry.gauge(
+    "lfg_gateway_latency_seconds", "Gateway heartbeat latency",
+    lambda: bot.latency if bot.latency == bot.latency and bot.latency != float("inf") else None
+)
 
 
 # --- Helper Functions ---
 def is_officer(member: discord.Member) -> bool:
-    return any(role.id in OFFICER_ROLE_IDS for role in member.roles)
+    officer_role_ids = config.current.officer_role_ids
+    return any(role.id in officer_role_ids for role in member.roles)
 
 
 async def dm_admin(msg: str):
-    try:
-        owner = await bot.fetch_user(BOT_OWNER_ID)
-        await owner.send(f"[ADMIN DM] {msg}")
-    except Exception as e:
-        logger.error(f"Failed to DM admin: {e}")
+    # Queued into the next digest; never blocks the caller on a REST call
+    logger.error(msg)
+    admin_alerts.report(msg)
+
+
+# Fire-and-forget tasks; the loop only holds weak references, so they are kept here until done
+background_tasks = set()
+
+
+def spawn(coro) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_task_done)
+    return task
+
+
+def background_task_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_coro().__qualname__} failed: {task.exception()!r}")
+
+
+MESSAGE_LIMIT = 2000  # characters per Discord message
+
+
+async def send_lines(ctx, header: str, lines: list):
+    # Per-guild reports outgrow one message with enough guilds; split at line boundaries
+    chunk = header
+    for line in lines:
+        line = line[:MESSAGE_LIMIT]
+        if len(chunk) + 1 + len(line) > MESSAGE_LIMIT:
+            await ctx.send(chunk)
+            chunk = line
+        else:
+            chunk = f"{chunk}\n{line}"
+    await ctx.send(chunk)
 
 
 async def delete_vc_safe(vc: discord.VoiceChannel):
     try:
-        managed_vcs.discard(vc.id)
-        for uid, vid in list(user_join_create.items()):
-            if vid == vc.id:
-                user_join_create.pop(uid, None)
-        await vc.delete()
+        msg_id = state.for_guild(vc.guild.id).remove_vc(vc.id)
+        state_store.delete_vc(vc.id)
+        if msg_id is not None:
+            await retire_post(vc.guild.id, msg_id)
+        await rest.run(BACKGROUND, vc.delete())
     except Exception as e:
         await dm_admin(f"Failed to delete VC {vc.name}: {e}")
     finally:
-        task = vc_inactivity_tasks.pop(vc.id, None)
-        if task and not task.done():
-            task.cancel()
+        vc_expiry.cancel((vc.guild.id, vc.id))
 
 
-def schedule_vc_inactivity(vc: discord.VoiceChannel, delay: int = 60):
-    async def _wait_and_delete():
-        try:
-            await asyncio.sleep(delay)
-            current = vc.guild.get_channel(vc.id)
-            if isinstance(current, discord.VoiceChannel) and len(current.members) == 0:
-                await delete_vc_safe(current)
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            await dm_admin(f"VC inactivity task failed for {vc.name}: {e}")
+async def expire_inactive_vcs(keys: list):
+    to_delete = []
+    for guild_id, vc_id in keys:
+        guild = bot.get_guild(guild_id)
+        vc = guild.get_channel(vc_id) if guild else None
+        if not isinstance(vc, discord.VoiceChannel):
+            # Already gone, just drop the bookkeeping
+            msg_id = state.for_guild(guild_id).remove_vc(vc_id)
+            state_store.delete_vc(vc_id)
+            if msg_id is not None:
+                await retire_post(guild_id, msg_id)
+        elif len(vc.members) == 0:
+            to_delete.append(vc)
+        else:
+            state_store.clear_timer(vc_id)
+    results = await asyncio.gather(*(delete_vc_safe(vc) for vc in to_delete), return_exceptions=True)
+    for vc, result in zip(to_delete, results):
+        if isinstance(result, Exception):
+            await dm_admin(f"VC inactivity cleanup failed for {vc.name}: {result}")
+
+
+def schedule_vc_inactivity(vc: discord.VoiceChannel, delay: float = 60):
+    vc_expiry.schedule((vc.guild.id, vc.id), delay)
+    state_store.put_timer(vc.id, time.time() + delay)
+
 
-    old_task = vc_inactivity_tasks.get(vc.id)
-    if old_task and not old_task.done():
-        old_task.cancel()
-    vc_inactivity_tasks[vc.id] = bot.loop.create_task(_wait_and_delete())
+def cancel_vc_inactivity(guild_id: int, vc_id: int):
+    if vc_expiry.cancel((guild_id, vc_id)):
+        state_store.clear_timer(vc_id)
+
+
+# One heap-driven scheduler for every managed VC's inactivity deadline, keyed by (guild.id, vc.id)
+vc_expiry = ExpiryScheduler(expire_inactive_vcs)
 
 
 # --- LFG Modal ---
+submit_latency = StepLatency()  # per-step timings of LFGModal.on_submit
+
+
 class LFGModal(discord.ui.Modal):
     def __init__(self, user: discord.Member, guild_key: str):
         super().__init__(title="Create LFG Post")
@@ -112,10 +317,16 @@ class LFGModal(discord.ui.Modal):
         self.add_item(self.desc_input)
         self.add_item(self.max_input)
 
+    @metrics.timed("lfg_submit")
     async def on_submit(self, interaction: discord.Interaction):
+        start = time.perf_counter()
         try:
             guild = interaction.guild
-            data = SERVERS[self.guild_key]
+            data = config.current.servers.get(self.guild_key)
+            if data is None:
+                await interaction.response.send_message("⚠️ LFG is no longer configured for this server.",
+                                                        ephemeral=True)
+                return
             alert_channel = guild.get_channel(data["alert"])
 
             # Get the LFG category and check if it exists
@@ -126,60 +337,146 @@ class LFGModal(discord.ui.Modal):
                 await interaction.response.send_message("⚠️ Cannot create VC: category not found.", ephemeral=True)
                 return
 
-            if self.user.id in user_active_lfg and not is_officer(self.user):
+            guild_state = state.for_guild(guild.id)
+            if guild_state.has_active_post(self.user.id) and not is_officer(self.user):
                 await interaction.response.send_message("⚠️ You already have an active LFG post.", ephemeral=True)
                 return
 
+            allowed, retry_after = submit_throttle.check(guild.id, self.user.id)
+            if not allowed:
+                await interaction.response.send_message(
+                    f"⏳ Too many LFG posts right now, try again in {retry_after:.0f}s.", ephemeral=True)
+                return
+
             max_players = int(self.max_input.value)
-            user_limit = None if max_players == 0 else max_players
 
-            # Create voice channel
+            # Acknowledge right away so API latency below can't blow the 3s interaction deadline
+            await submit_latency.track("defer", interaction.response.defer(ephemeral=True, thinking=True))
+
+            # Create voice channel, user limit included (0 = unlimited)
             overwrites = {
                 guild.default_role: discord.PermissionOverwrite(connect=True),
                 guild.me: discord.PermissionOverwrite(connect=True, manage_channels=True)
             }
             vc_name = self.desc_input.value.strip()
-            temp_vc = await guild.create_voice_channel(vc_name, overwrites=overwrites, category=lfg_category)
-            if user_limit:
-                await temp_vc.edit(user_limit=user_limit)
-            managed_vcs.add(temp_vc.id)
-
-            # Build embed
-            embed = discord.Embed(title=vc_name, color=discord.Color.blue())
-            embed.add_field(name="Host", value=self.host_input.value, inline=False)
-            embed.add_field(name="Voice Channel", value=temp_vc.mention, inline=False)
-            max_label = "∞" if max_players == 0 else str(max_players)
-            embed.add_field(name="Current Squad", value=f"1/{max_label} {self.user.mention}", inline=False)
-            embed.add_field(name="Max Party Size", value=max_label, inline=False)
-
-            # Create LFG view
+            temp_vc = await submit_latency.track("create_vc", rest.run(USER, guild.create_voice_channel(
+                vc_name, overwrites=overwrites, category=lfg_category, user_limit=max_players)))
+            guild_state.add_vc(temp_vc.id)
+            state_store.put_vc(temp_vc.id, guild.id, "lfg", self.user.id)
+            schedule_vc_inactivity(temp_vc, 60)
+
+            host_name = self.host_input.value
+            embed = new_post_embed(vc_name, host_name, temp_vc.id, max_players, [self.user.id])
+
+            # Move the host while the LFG view is being posted
+            move_task = asyncio.create_task(submit_latency.track("move_host", self._move_host(temp_vc)))
             view = LFGView(msg_id=None, max_players=max_players, host_id=self.user.id)
-            msg = await alert_channel.send(content=f"{self.user.mention} is looking for a group!", embed=embed,
-                                           view=view)
+            msg = await submit_latency.track("send_alert", rest.run(USER, alert_channel.send(
+                content=f"{self.user.mention} is looking for a group!", embed=embed, view=view)))
             view.msg = msg
             view.msg_id = msg.id
 
             # Track squads
-            if guild.id not in squads:
-                squads[guild.id] = {}
-            squads[guild.id][msg.id] = [self.user]
-
-            schedule_vc_inactivity(temp_vc, 60)
-            user_active_lfg[self.user.id] = msg.id
-
-            # Move user to VC
-            try:
-                await self.user.move_to(temp_vc)
-            except:
-                pass
+            guild_state.add_post(msg.id, guild.id, self.user.id, max_players, temp_vc.id, alert_channel.id,
+                                 vc_name, host_name)
+            guild_state.join(msg.id, self.user.id)
+            state_store.put_post(msg.id, guild.id, alert_channel.id, self.user.id, max_players, temp_vc.id,
+                                 [self.user.id], vc_name, host_name)
+            tracer.created_post(guild.id, self.user.id, msg.id, temp_vc.id)
 
-            await interaction.response.send_message("✅ LFG posted!", ephemeral=True)
+            await move_task
+            await submit_latency.track("followup", interaction.followup.send("✅ LFG posted!", ephemeral=True))
         except Exception as e:
             await dm_admin(f"LFGModal submit error: {e}")
-            await interaction.response.send_message("⚠️ Failed to create LFG post.", ephemeral=True)
+            if interaction.response.is_done():
+                await interaction.followup.send("⚠️ Failed to create LFG post.", ephemeral=True)
+            else:
+                await interaction.response.send_message("⚠️ Failed to create LFG post.", ephemeral=True)
+        finally:
+            submit_latency.record("total", time.perf_counter() - start)
+
+    async def _move_host(self, vc: discord.VoiceChannel):
+        try:
+            await rest.run(USER, self.user.move_to(vc))
+        except:
+            pass
 
 
 # --- LFG View ---
+def render_post_embed(msg: discord.Message) -> discord.Embed:
+    post = state.for_guild(msg.guild.id).get_post(msg.id)
+    if post is None:
+        return None  # deleted since the edit was queued
+    # The message's own embed is only read for posts restored without a stored title
+    return post_embeds.render(post, seed=msg.embeds[0] if not post.title and msg.embeds else None)
+
+
+def update_post_embed(msg: discord.Message):
+    # Coalesced: bursts of joins/leaves collapse into one edit rendered from the latest state
+    embed_updates.request(msg, lambda: render_post_embed(msg))
+
+
+async def refresh_post_embed(guild: discord.Guild, post):
+    # Quick Join has no message object in hand; an edit already queued will render the latest squad anyway
+    if embed_updates.is_pending(post.msg_id):
+        return
+    channel = guild.get_channel(post.channel_id)
+    try:
+        msg = await rest.run(COSMETIC, channel.fetch_message(post.msg_id))
+    except Exception as e:
+        logger.error(f"Couldn't fetch LFG post {post.msg_id} to update its squad: {e}")
+        return
+    update_post_embed(msg)
+
+
+# Joins (button and Quick Join), leaves and deletes go through a per-post queue; each batch persists and
+# renders once. msg may be a PartialMessage (Quick Join has no message in hand).
+def on_squad_batch(msg_id: int, msg: discord.Message):
+    post = state.for_guild(msg.guild.id).get_post(msg_id) if msg else None
+    if post is None:
+        return
+    state_store.put_members(msg_id, list(post.members))
+    if post.title or getattr(msg, "embeds", None):
+        update_post_embed(msg)
+    else:
+        # Restored from an older database: the template is seeded from the real message once
+        spawn(refresh_post_embed(msg.guild, post))
+
+
+def squad_join(guild_state: LFGState, msg_id: int, user_id: int):
+    # Post actor op: (result, changed)
+    result = guild_state.join(msg_id, user_id)
+    return result, result == LFGState.JOINED
+
+
+post_actors = PostActors(on_squad_batch)
+
+
+async def retire_post(guild_id: int, msg_id: int, message_exists: bool = True):
+    # The post's VC or message is gone: drop the squad (releasing the host's active-post lock) and its buttons
+    guild_state = state.for_guild(guild_id)
+    post = await post_actors.submit(msg_id, lambda: (guild_state.remove_post(msg_id), False))
+    embed_updates.cancel(msg_id)
+    post_embeds.forget(msg_id)
+    state_store.delete_post(msg_id)
+    if not message_exists:
+        return
+    guild = bot.get_guild(guild_id)
+    channel = guild.get_channel(post.channel_id) if guild and post and post.channel_id else None
+    if channel is None:
+        return
+    msg = channel.get_partial_message(msg_id)
+    try:
+        if reconciler.archive_posts:
+            await rest.run(BACKGROUND, msg.edit(view=None))
+        else:
+            await rest.run(BACKGROUND, msg.delete())
+    except discord.NotFound:
+        pass
+    except Exception as e:
+        logger.warning(f"Couldn't retire LFG post {msg_id} after its VC was removed: {e}")
+
+
 class LFGView(discord.ui.View):
     def __init__(self, msg_id: int, host_id: int, max_players: int):
         super().__init__(timeout=None)
@@ -187,144 +484,609 @@ class LFGView(discord.ui.View):
         self.host_id = host_id
         self.max_players = max_players
 
-    async def update_embed(self, msg: discord.Message):
-        guild_id = msg.guild.id
-        squad = squads.get(guild_id, {}).get(self.msg_id, [])
-        embed = msg.embeds[0].copy()
-        max_label = "∞" if self.max_players == 0 else str(self.max_players)
-        value = "\n".join([f"{i + 1}/{max_label} {m.mention}" for i, m in enumerate(squad)]) or "Empty"
-        for i, f in enumerate(embed.fields):
-            if f.name == "Current Squad":
-                embed.set_field_at(i, name="Current Squad", value=value, inline=False)
-        await msg.edit(embed=embed)
-
     @discord.ui.button(label="Join", style=discord.ButtonStyle.success, custom_id="lfg_join")
+    @metrics.timed("lfg_join")
     async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild_id = interaction.guild.id
-        squad = squads.get(guild_id, {}).get(self.msg_id, [])
-        if self.max_players != 0 and len(squad) >= self.max_players:
+        guild_state = state.for_guild(interaction.guild.id)
+        user_id = interaction.user.id
+        result = await post_actors.submit(self.msg_id, lambda: squad_join(guild_state, self.msg_id, user_id),
+                                          interaction.message)
+        if result == LFGState.FULL:
             await interaction.response.send_message("⚠️ Party full!", ephemeral=True)
             return
-        if interaction.user not in squad:
-            squad.append(interaction.user)
-        squads[guild_id][self.msg_id] = squad
-        await self.update_embed(interaction.message)
+        if result == LFGState.MISSING:
+            await interaction.response.send_message("⚠️ This LFG post is no longer active.", ephemeral=True)
+            return
         await interaction.response.defer()
 
     @discord.ui.button(label="Leave", style=discord.ButtonStyle.danger, custom_id="lfg_leave")
+    @metrics.timed("lfg_leave")
     async def leave_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild_id = interaction.guild.id
-        squad = squads.get(guild_id, {}).get(self.msg_id, [])
-        if interaction.user in squad:
-            squad.remove(interaction.user)
-        squads[guild_id][self.msg_id] = squad
-        await self.update_embed(interaction.message)
+        guild_state = state.for_guild(interaction.guild.id)
+        user_id = interaction.user.id
+
+        def leave():
+            left = guild_state.leave(self.msg_id, user_id)
+            return left, left
+
+        await post_actors.submit(self.msg_id, leave, interaction.message)
         await interaction.response.defer()
 
     @discord.ui.button(label="Delete", style=discord.ButtonStyle.danger, custom_id="lfg_delete")
+    @metrics.timed("lfg_delete")
     async def delete_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.host_id and not is_officer(interaction.user):
             await interaction.response.send_message("Only host or officers can delete.", ephemeral=True)
             return
-        guild_id = interaction.guild.id
-        squads.get(guild_id, {}).pop(self.msg_id, None)
+        guild_state = state.for_guild(interaction.guild.id)
+        # Queued behind any joins/leaves already in flight for this post
+        await post_actors.submit(self.msg_id, lambda: (guild_state.remove_post(self.msg_id), False))
+        embed_updates.cancel(self.msg_id)
+        post_embeds.forget(self.msg_id)
+        state_store.delete_post(self.msg_id)
+        # Answer within the interaction deadline; the message delete can wait for a REST slot
+        await interaction.response.send_message("✅ LFG post deleted.", ephemeral=True)
         try:
-            await interaction.message.delete()
+            await rest.run(USER, interaction.message.delete())
         except:
             pass
-        await interaction.response.send_message("✅ LFG post deleted.", ephemeral=True)
 
 
 # --- Deploy Button ---
+QUICK_JOIN_ATTEMPTS = 10  # posts tried when the best one fills up while the join is queued
+
+
 class DeployLFGButtonView(discord.ui.View):
     def __init__(self, guild_key: str):
         super().__init__(timeout=None)
         self.guild_key = guild_key
 
     @discord.ui.button(label="Create LFG Post", style=discord.ButtonStyle.primary, custom_id="deploy_lfg")
+    @metrics.timed("deploy_lfg")
     async def deploy_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(LFGModal(interaction.user, self.guild_key))
+        # Every guild's persistent view shares this custom_id, so resolve the config from the guild itself
+        guild_key = config.current.routes.guild_key(interaction.guild.id) or self.guild_key
+        await interaction.response.send_modal(LFGModal(interaction.user, guild_key))
+
+    @discord.ui.button(label="Quick Join", style=discord.ButtonStyle.success, custom_id="lfg_quick_join")
+    @metrics.timed("lfg_quick_join")
+    async def quick_join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild = interaction.guild
+        member = interaction.user
+        guild_state = state.for_guild(guild.id)
+        post = None
+        for _ in range(QUICK_JOIN_ATTEMPTS):
+            candidate = guild_state.best_open_post(guild.id, member.id)
+            if candidate is None:
+                break
+            channel = guild.get_channel(candidate.channel_id) if candidate.channel_id else None
+            msg_id = candidate.msg_id
+            result = await post_actors.submit(
+                msg_id, lambda: squad_join(guild_state, msg_id, member.id),
+                channel.get_partial_message(msg_id) if channel else None)
+            if result in (LFGState.JOINED, LFGState.ALREADY):
+                post = candidate
+                break
+            # Filled up or deleted while queued behind other clicks; the index drops it, try the next best
+        if post is None:
+            await interaction.response.send_message("No open squads right now. Create one with the button above!",
+                                                    ephemeral=True)
+            return
+
+        vc = guild.get_channel(post.vc_id) if post.vc_id else None
+        max_label = "∞" if post.max_players == 0 else str(post.max_players)
+        reply = f"✅ Joined <@{post.host_id}>'s squad ({len(post.members)}/{max_label})"
+        if vc and member.voice and member.voice.channel:
+            reply += f", moving you to {vc.mention}"
+        elif vc:
+            reply += f", hop into {vc.mention}"
+        await interaction.response.send_message(reply, ephemeral=True)
+
+        if vc and member.voice and member.voice.channel and member.voice.channel.id != vc.id:
+            try:
+                await rest.run(USER, member.move_to(vc))
+            except Exception as e:
+                logger.warning(f"Quick Join couldn't move {member.id} to VC {vc.id}: {e}")
+
+
+def message_custom_ids(msg: discord.Message) -> set:
+    return {
+        getattr(child, "custom_id", None)
+        for row in msg.components for child in getattr(row, "children", ())
+    }
+
+
+def is_deploy_message(msg: discord.Message) -> bool:
+    return "deploy_lfg" in message_custom_ids(msg)
 
 
 # --- Backup/Cleanup Command ---
+REFRESH_CONCURRENCY = 4  # guilds refreshed at once
+
+
+async def refresh_guild(guild_key: str, data: dict, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        guild = bot.get_guild(data["server_id"])
+        if not guild:
+            return None
+        post_channel = guild.get_channel(data["posting"])
+        if not post_channel:
+            return None
+
+        # Only the bot's own messages can carry our buttons; keep the newest deploy message as-is
+        edits = 0
+        deploy_msg = None
+        async for msg in post_channel.history(limit=100):
+            if msg.author.id != bot.user.id or not msg.components:
+                continue
+            if deploy_msg is None and is_deploy_message(msg):
+                deploy_msg = msg
+                continue
+            try:
+                await rest.run(BACKGROUND, msg.edit(view=None))
+                edits += 1
+            except:
+                pass
+
+        if deploy_msg is None:
+            view = DeployLFGButtonView(guild_key)
+            await rest.run(BACKGROUND, post_channel.send("Click the button below to create an LFG post!", view=view))
+        elif "lfg_quick_join" not in message_custom_ids(deploy_msg):
+            # Deployed before Quick Join existed; give it the current buttons
+            await rest.run(BACKGROUND, deploy_msg.edit(view=DeployLFGButtonView(guild_key)))
+            edits += 1
+        return {"edits": edits, "reused": deploy_msg is not None, "elapsed": time.perf_counter() - start}
+
+
 @bot.command()
 @commands.is_owner()
+@metrics.timed("refresh_lfg")
 async def refresh_lfg(ctx):
     try:
-        for guild_key, data in SERVERS.items():
-            guild = bot.get_guild(data["server_id"])
-            if not guild:
-                continue
+        start = time.perf_counter()
+        servers = config.current.servers
+        semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        results = await asyncio.gather(
+            *(refresh_guild(guild_key, data, semaphore) for guild_key, data in servers.items()),
+            return_exceptions=True
+        )
+    except Exception as e:
+        await dm_admin(f"refresh_lfg command failed: {e}")
+        await ctx.send(f"⚠️ Failed to refresh LFG: {e}")
+        return
 
-            post_channel = guild.get_channel(data["posting"])
-            if not post_channel:
-                continue
+    lines = []
+    for guild_key, result in zip(servers, results):
+        if isinstance(result, Exception):
+            await dm_admin(f"refresh_lfg failed for {guild_key}: {result}")
+            lines.append(f"{guild_key}: ⚠️ {result}")
+        elif result is None:
+            lines.append(f"{guild_key}: skipped (guild or posting channel not found)")
+        else:
+            action = "reused deploy message" if result["reused"] else "posted new button"
+            lines.append(f"{guild_key}: {result['edits']} edits, {action}, {result['elapsed']:.1f}s")
+    await send_lines(ctx, f"✅ LFG cleanup complete in {time.perf_counter() - start:.1f}s", lines)
 
-            messages = [msg async for msg in post_channel.history(limit=100)]
-            for msg in messages:
-                if msg.components:
-                    try:
-                        await msg.edit(view=None)
-                    except:
-                        pass
 
-            view = DeployLFGButtonView(guild_key)
-            await post_channel.send("Click the button below to create an LFG post!", view=view)
+@bot.command()
+@commands.is_owner()
+async def lfg_stats(ctx):
+    stats = embed_updates.stats()
+    expiry = vc_expiry.stats()
+    sampler = payload_sampler()
+    next_deadline = "none" if expiry["next_deadline"] is None else f"{expiry['next_deadline']:.0f}s"
+    await ctx.send(
+        f"Embed edits: {stats['edits_sent']} sent, {stats['edits_saved']} saved by coalescing, "
+        f"{stats['edits_failed']} failed, {stats['pending']} pending\n"
+        f"Post embeds: {post_embeds.renders} renders, {post_embeds.misses} template builds, "
+        f"{post_embeds.lines_formatted} squad lines formatted\n"
+        f"VC inactivity timers: {expiry['pending']} pending, next deadline {next_deadline}, "
+        f"{expiry['expired']} expired in {expiry['batches']} batches\n"
+        f"VC pool: {vc_pool.idle_count()} idle, {vc_pool.claims} claims, {vc_pool.misses} misses | "
+        f"pooled {vc_pool.pooled.describe()} | cold {vc_pool.cold.describe()}\n"
+        f"LFG submit steps:\n{submit_latency.describe()}\n"
+        f"Log sampling: {sampler.dropped} gateway/http payloads dropped, {sampler.truncated} truncated\n"
+        f"Admin alerts: {admin_alerts.pending} waiting for the next digest\n"
+        f"Squad queues: {post_actors.ops} ops in {post_actors.batches} batches, {post_actors.contended} contended, "
+        f"max depth {post_actors.max_depth}, wait {post_actors.wait.describe()}\n"
+        f"Throttled: join-to-create {join_throttle.refused}/{join_throttle.allowed + join_throttle.refused}, "
+        f"LFG submit {submit_throttle.refused}/{submit_throttle.allowed + submit_throttle.refused}\n"
+        f"REST scheduler ({rest.in_flight}/{rest.max_concurrent} in flight):\n{rest.describe()}")
+
 
-        await ctx.send("✅ LFG cleanup complete and new buttons posted in posting channels!")
+@bot.command()
+@commands.is_owner()
+async def reload_config(ctx):
+    old = config.current
+    try:
+        new = config.reload()
     except Exception as e:
-        await dm_admin(f"refresh_lfg command failed: {e}")
-        await ctx.send(f"⚠️ Failed to refresh LFG: {e}")
+        await ctx.send(f"⚠️ Config rejected, still on version {old.version}: {e}")
+        return
+    added = sorted(new.servers.keys() - old.servers.keys())
+    removed = sorted(old.servers.keys() - new.servers.keys())
+    await ctx.send(
+        f"✅ Config version {new.version}: {len(new.servers)} servers, {len(new.officer_role_ids)} officer roles"
+        + (f"\nAdded: {', '.join(added)}" if added else "")
+        + (f"\nRemoved: {', '.join(removed)}" if removed else "")
+        + (f"\n⚠️ Applied, but pool warm-up/view registration failed: {config.callback_error}"
+           if config.callback_error else ""))
 
 
 # --- Voice State Updates ---
+async def send_back(member: discord.Member, channel, notice: str = None):
+    # Refused join-to-create hop: off the handler's path and behind admitted members' moves.
+    # The DM fails for members with DMs closed.
+    try:
+        await rest.run(BACKGROUND, member.move_to(channel))
+    except Exception as e:
+        logger.info(f"Couldn't move {member.id} back: {e}")
+    if notice:
+        try:
+            await rest.run(BACKGROUND, member.send(notice))
+        except Exception as e:
+            logger.info(f"Couldn't send notice to {member.id}: {e}")
+
+
 @bot.event
+@metrics.timed("on_voice_state_update")
 async def on_voice_state_update(member, before, after):
     try:
-        if before.channel and before.channel.id in managed_vcs and len(before.channel.members) == 0:
+        shard_events.inc(member.guild.shard_id, "voice_state_update")
+        before_id = before.channel.id if before.channel else None
+        after_id = after.channel.id if after.channel else None
+        tracer.voice(member.guild.id, member.id, before_id, after_id)
+        guild_state = state.for_guild(member.guild.id)
+        routes = config.current.routes
+
+        # Fast path: most events touch neither a join-to-create channel nor a managed VC
+        route = route_voice_event(routes, guild_state.managed_vcs, before_id, after_id)
+        if route is None:
+            return
+        left_managed, joined_managed, join_key = route
+
+        if left_managed and len(before.channel.members) == 0:
             schedule_vc_inactivity(before.channel, 60)
-        if after.channel and after.channel.id in managed_vcs:
-            task = vc_inactivity_tasks.get(after.channel.id)
-            if task and not task.done():
-                task.cancel()
-
-        for key, data in SERVERS.items():
-            join_to_create = data["join_to_create"]
-            if after.channel and after.channel.id == join_to_create:
-                if member.id in user_join_create:
-                    await member.send("⚠️ You already have an active VC!")
-                    try:
-                        await member.move_to(before.channel)
-                    except:
-                        pass
-                    return
-
-                overwrites = {
-                    member.guild.default_role: discord.PermissionOverwrite(connect=True),
-                    member.guild.me: discord.PermissionOverwrite(connect=True, manage_channels=True)
-                }
-                join_category = after.channel.category
-                new_vc = await member.guild.create_voice_channel(
-                    f"{member.display_name}'s VC",
+        if joined_managed:
+            cancel_vc_inactivity(member.guild.id, after.channel.id)
+
+        if join_key and routes.guild_key(member.guild.id) == join_key:
+            if guild_state.owned_vc(member.id) is not None:
+                spawn(send_back(member, before.channel, "⚠️ You already have an active VC!"))
+                return
+
+            allowed, retry_after = join_throttle.check(member.guild.id, member.id)
+            if not allowed:
+                # Send them back where they came from; tell them once a minute, not on every hop
+                notice = None
+                now = time.monotonic()
+                if not throttle_notices.retry_after(member.id, now):
+                    throttle_notices.consume(member.id, now)
+                    notice = f"⏳ You're creating VCs too quickly, try again in {retry_after:.0f}s."
+                spawn(send_back(member, before.channel, notice))
+                return
+
+            overwrites = {
+                member.guild.default_role: discord.PermissionOverwrite(connect=True),
+                member.guild.me: discord.PermissionOverwrite(connect=True, manage_channels=True)
+            }
+            join_category = after.channel.category
+            vc_name = f"{member.display_name}'s VC"
+            start = time.perf_counter()
+            new_vc = vc_pool.claim(join_category) if join_category else None
+            if new_vc is not None:
+                # Pooled: the channel already exists, so rename/unlock it while moving the member
+                guild_state.add_vc(new_vc.id, owner_id=member.id)
+                state_store.put_vc(new_vc.id, member.guild.id, "join", member.id)
+                tracer.created_vc(member.guild.id, member.id, new_vc.id)
+                # Armed before the REST calls so a failed move/rename can't leave an unreaped, owned VC;
+                # the member's arrival cancels it
+                schedule_vc_inactivity(new_vc, 60)
+                await asyncio.gather(rest.run(USER, member.move_to(new_vc)),
+                                     rest.run(USER, new_vc.edit(name=vc_name, overwrites=overwrites)))
+                vc_pool.pooled.record(time.perf_counter() - start)
+            else:
+                new_vc = await rest.run(USER, member.guild.create_voice_channel(
+                    vc_name,
                     overwrites=overwrites,
                     category=join_category
-                )
-                managed_vcs.add(new_vc.id)
-                user_join_create[member.id] = new_vc.id
-                await member.move_to(new_vc)
+                ))
+                guild_state.add_vc(new_vc.id, owner_id=member.id)
+                state_store.put_vc(new_vc.id, member.guild.id, "join", member.id)
+                tracer.created_vc(member.guild.id, member.id, new_vc.id)
                 schedule_vc_inactivity(new_vc, 60)
+                await rest.run(USER, member.move_to(new_vc))
+                vc_pool.cold.record(time.perf_counter() - start)
     except Exception as e:
         await dm_admin(f"Voice state update error: {e}")
 
 
+# --- Restart Recovery ---
+async def restore_state():
+    snapshot = await state_store.load()
+    now = time.time()
+    # The database may be shared with processes running other shards; only take our guilds
+    for row in snapshot["vcs"]:
+        guild = bot.get_guild(row["guild_id"]) if state.owns(row["guild_id"]) else None
+        if guild is None:
+            continue
+        vc = guild.get_channel(row["vc_id"])
+        if not isinstance(vc, discord.VoiceChannel):
+            state_store.delete_vc(row["vc_id"])
+            continue
+        state.for_guild(guild.id).add_vc(vc.id, owner_id=row["owner_id"] if row["kind"] == "join" else None)
+        if len(vc.members) == 0:
+            # Resume the inactivity timer with whatever time it had left
+            remaining = 60 if row["expires_at"] is None else max(0.0, row["expires_at"] - now)
+            schedule_vc_inactivity(vc, remaining)
+        else:
+            state_store.clear_timer(vc.id)
+
+    # Squads are plain user ids, so no member lookups are needed to restore them
+    restored_posts = dropped_posts = 0
+    for row in snapshot["posts"]:
+        if not state.owns(row["guild_id"]) or bot.get_guild(row["guild_id"]) is None:
+            continue
+        guild_state = state.for_guild(row["guild_id"])
+        if not guild_state.is_managed(row["vc_id"]):
+            # Its VC was reaped (or deleted) while we were down: the post is over. Its message, if any,
+            # is archived by the startup reconciliation sweep.
+            state_store.delete_post(row["msg_id"])
+            dropped_posts += 1
+            continue
+        guild_state.add_post(row["msg_id"], row["guild_id"], row["host_id"], row["max_players"], row["vc_id"],
+                             row["channel_id"], row["title"], row["host_name"])
+        for user_id in row["members"]:
+            guild_state.join(row["msg_id"], user_id)
+        restored_posts += 1
+        view = LFGView(msg_id=row["msg_id"], host_id=row["host_id"], max_players=row["max_players"])
+        bot.add_view(view, message_id=row["msg_id"])
+
+    counts = state.stats()
+    logger.info(f"Restored {restored_posts} LFG posts and {counts.get('managed_vcs', 0)} managed VCs, "
+                f"dropped {dropped_posts} posts whose VC is gone")
+
+
+def warm_vc_pool(data: dict):
+    guild = bot.get_guild(data["server_id"])
+    if not guild:
+        return
+    join_channel = guild.get_channel(data["join_to_create"])
+    # A size of 0 only matters for a category that already has a pool (it shrinks it to nothing)
+    if join_channel and join_channel.category and (data["vc_pool_size"] or join_channel.category.id in vc_pool.sizes):
+        vc_pool.register(join_channel.category, data["vc_pool_size"])
+
+
+def warm_vc_pools():
+    for data in config.current.servers.values():
+        warm_vc_pool(data)
+
+
+# --- Reconciliation ---
+async def reconcile_guilds() -> dict:
+    reports = {}
+    for guild_key, data in config.current.servers.items():
+        guild = bot.get_guild(data["server_id"])
+        if guild is None or not state.owns(guild.id):
+            continue
+        guild_state = state.for_guild(guild.id)
+        join_channel = guild.get_channel(data["join_to_create"])
+        categories = {
+            c.id: c for c in (guild.get_channel(data["lfg_category"]), getattr(join_channel, "category", None)) if c
+        }
+        reports[guild_key] = await reconciler.sweep(
+            guild, categories.values(), guild.get_channel(data["alert"]),
+            is_tracked_vc=lambda vc_id: guild_state.is_managed(vc_id) or vc_pool.is_idle(vc_id),
+            is_live_post=lambda msg_id: guild_state.get_post(msg_id) is not None,
+            skip_ids={data["join_to_create"]},
+            tracked_posts=[
+                msg_id for msg_id in guild_state.guild_post_ids(guild.id)
+                if guild_state.get_post(msg_id).channel_id == data["alert"]
+            ],
+            forget_post=lambda msg_id: retire_post(guild.id, msg_id, message_exists=False)
+        )
+    vcs = sum(r["vcs"] for r in reports.values())
+    posts = sum(r["posts"] for r in reports.values())
+    lost = sum(r["lost_posts"] for r in reports.values())
+    if vcs or posts or lost:
+        summary = ", ".join(f"{key}: {r['vcs']} VCs, {r['posts']} posts, {r['lost_posts']} lost"
+                            for key, r in reports.items())
+        logger.info(f"Reconciliation reclaimed {vcs} orphaned VCs, {posts} stale LFG posts and {lost} squads "
+                    f"whose message was deleted ({summary})")
+        admin_alerts.report(f"Reconciliation reclaimed {vcs} orphaned VCs, {posts} stale LFG posts and {lost} squads "
+                            f"whose message was deleted")
+    return reports
+
+
+@bot.command()
+@commands.is_owner()
+async def reconcile(ctx):
+    try:
+        reports = await reconcile_guilds()
+    except Exception as e:
+        await ctx.send(f"⚠️ Reconciliation failed: {e}")
+        return
+    lines = [
+        f"{key}: {r['vcs']} VCs deleted, {r['posts']} posts {'archived' if reconciler.archive_posts else 'deleted'}, "
+        f"{r['lost_posts']} squads without a message dropped, {r['failed']} failed (scanned {r['scanned_vcs']} VCs, {r['scanned_posts']} messages in {r['elapsed']:.1f}s)"
+        for key, r in reports.items()
+    ]
+    await send_lines(ctx, "🧹 Reconciliation complete", lines or ["No configured guilds in cache"])
+
+
+async def startup_reconcile():
+    try:
+        await reconcile_guilds()
+    except Exception as e:
+        await dm_admin(f"Startup reconciliation failed: {e}")
+    reconciler.start(reconcile_guilds, RECONCILE_INTERVAL)
+
+
+# --- Live State Dump (/state) ---
+def dump_state() -> dict:
+    loop_now = asyncio.get_running_loop().time()
+    deadlines = {vc_id: deadline for (_, vc_id), deadline in vc_expiry.items()}
+    vcs = []
+    for shard_id, partition in state.partitions.items():
+        for vc_id in partition.managed_vcs:
+            deadline = deadlines.get(vc_id)
+            owner_id = partition.vc_owner.get(vc_id)
+            vcs.append({
+                "vc_id": str(vc_id),
+                "shard": shard_id,
+                "owner_id": str(owner_id) if owner_id else None,
+                "post_id": str(partition.vc_post[vc_id]) if vc_id in partition.vc_post else None,
+                "expires_in": round(deadline - loop_now, 1) if deadline is not None else None,
+            })
+    posts = [
+        {
+            "msg_id": str(post.msg_id),
+            "guild_id": str(post.guild_id),
+            "host_id": str(post.host_id),
+            "max_players": post.max_players,
+            "vc_id": str(post.vc_id) if post.vc_id else None,
+            "members": [str(user_id) for user_id in post.members],
+        }
+        for post in state.iter_posts()
+    ]
+    return {
+        "counts": state.stats(),
+        "shards": state.shard_stats(),
+        "posts": posts,
+        "managed_vcs": vcs,
+        "embed_updates": embed_updates.stats(),
+        "post_embeds": post_embeds.stats(),
+        "vc_expiry": vc_expiry.stats(),
+        "vc_pool": vc_pool.stats(),
+        "loop_lag": loop_lag.stats(),
+        "slow_callbacks": slow_callbacks.stats(),
+        "slow_handlers": [
+            {"handler": name, "ms": seconds * 1000, "at": at, "detail": detail}
+            for seconds, at, name, detail in metrics.slow_handlers.slowest(10)
+        ],
+        "rest_scheduler": rest.stats(),
+        "post_actors": post_actors.stats(),
+        "throttle": {"join_to_create": join_throttle.stats(), "lfg_submit": submit_throttle.stats()},
+    }
+
+
+# --- Interactions ---
+@bot.listen("on_interaction")
+async def count_interaction(interaction: discord.Interaction):
+    metrics.interactions.inc(interaction.type.name)
+    if interaction.guild:
+        shard_events.inc(interaction.guild.shard_id, "interaction")
+        if tracer.active and interaction.type in (discord.InteractionType.component,
+                                                  discord.InteractionType.modal_submit):
+            data = interaction.data or {}
+            values = [
+                child.get("value") for row in data.get("components", ())
+                for child in row.get("components", ())
+            ]
+            tracer.interaction(
+                interaction.guild.id, interaction.user.id,
+                "modal" if interaction.type == discord.InteractionType.modal_submit else "component",
+                data.get("custom_id"), interaction.message.id if interaction.message else None, values,
+                isinstance(interaction.user, discord.Member) and is_officer(interaction.user)
+            )
+
+
+# --- Event trace header ---
+def trace_header() -> dict:
+    # Starting conditions a replay needs: config, who sits in which VC, and VCs already managed
+    cfg = config.current
+    voice, managed = {}, {}
+    for data in cfg.servers.values():
+        guild = bot.get_guild(data["server_id"])
+        if guild is None:
+            continue
+        voice[guild.id] = {vc.id: [m.id for m in vc.members] for vc in guild.voice_channels if vc.members}
+        guild_state = state.for_guild(guild.id)
+        managed[guild.id] = [
+            [vc_id, guild_state.vc_owner.get(vc_id)] for vc_id in guild_state.managed_vcs if guild.get_channel(vc_id)
+        ]
+    return {"servers": cfg.servers, "officer_role_ids": sorted(cfg.officer_role_ids), "voice": voice,
+            "managed": managed}
+
+
+@bot.command()
+@commands.is_owner()
+async def trace(ctx, action: str = "status", path: str = None):
+    if action == "on":
+        if tracer.active:
+            await ctx.send(f"Already recording to {tracer.path}")
+            return
+        tracer.start(path or os.getenv("TRACE_FILE") or f"trace-{int(time.time())}.jsonl.gz", trace_header())
+        await ctx.send(f"🔴 Recording voice and interaction events to {tracer.path}")
+    elif action == "off":
+        stats = tracer.stats()
+        await tracer.stop()
+        await ctx.send(f"⏹️ Stopped: {stats['events']} events in {stats['path']}" if stats["path"] else "Not recording")
+    else:
+        stats = tracer.stats()
+        await ctx.send(f"Recording {stats['events']} events to {stats['path']}" if stats["path"] else "Not recording")
+
+
+def format_slowest(entries) -> str:
+    now = time.time()
+    return "\n".join(
+        f"  {seconds * 1000:.0f}ms {name}" + (f" ({detail})" if detail else "") + f", {now - at:.0f}s ago"
+        for seconds, at, name, detail in entries
+    ) or "  none"
+
+
+@bot.command()
+@commands.is_owner()
+async def perf(ctx, seconds: float = 0):
+    lag = loop_lag.stats()
+    handlers = sorted(metrics.handler_spans.steps.items(), key=lambda item: item[1].percentile(99), reverse=True)
+    report = (
+        f"Loop lag: now {lag['lag_ms']:.0f}ms, p99 {lag['p99_ms']:.0f}ms, max {lag['max_ms']:.0f}ms, "
+        f"{lag['stalls']} stalls over {loop_lag.stall_threshold * 1000:.0f}ms\n"
+        f"Slow callbacks (>= {slow_callbacks.threshold * 1000:.0f}ms): {slow_callbacks.count}\n"
+        f"{format_slowest(slow_callbacks.slowest.slowest(5))}\n"
+        f"Slowest handler calls:\n{format_slowest(metrics.slow_handlers.slowest(8))}\n"
+        f"Handlers by p99:\n" + "\n".join(f"  {name}: {stats.describe()}" for name, stats in handlers[:10])
+    )
+    await ctx.send(f"```\n{report[:1900]}\n```")
+    if seconds <= 0:
+        return
+    if profiler.running:
+        await ctx.send("⚠️ A profile capture is already running.")
+        return
+    seconds = min(seconds, PROFILE_MAX_SECONDS)
+    await ctx.send(f"⏺️ Sampling the event loop for {seconds:.0f}s…")
+    profile = await profiler.capture(seconds)
+    top = "\n".join(
+        f"  {own:>5} {total:>5}  {label}" for label, own, total in profile.top(12)
+    ) or "  (loop was idle)"
+    await ctx.send(
+        f"```\n{profile.samples} samples over {profile.elapsed:.1f}s, loop busy {profile.busy_share:.0%}\n"
+        f"   self total  function\n{top}\n```",
+        file=discord.File(io.BytesIO(profile.collapsed().encode()), filename=f"loop-profile-{int(time.time())}.txt"))
+
+
 # --- Bot Ready ---
 @bot.event
 async def on_ready():
-    for guild_key in SERVERS:
+    global first_ready
+    for guild_key in config.current.servers:
         bot.add_view(DeployLFGButtonView(guild_key))
+    if first_ready:
+        first_ready = False
+        try:
+            await restore_state()
+        except Exception as e:
+            await dm_admin(f"State restore failed: {e}")
+        warm_vc_pools()
+        # After restore and pool adoption, so only genuinely untracked leftovers are swept
+        spawn(startup_reconcile())
+        if os.getenv("TRACE_FILE"):
+            tracer.start(os.getenv("TRACE_FILE"), trace_header())
     print(f"✅ Logged in as {bot.user}")
 
 
-# --- Keep bot alive & run ---
-webserver.keep_alive()
-bot.run(TOKEN, log_level=logging.DEBUG)
+# --- Run (the health/metrics server starts in setup_hook) ---
+if __name__ == "__main__":
+    bot.run(TOKEN, log_handler=None)
@@ -0,0 +1,192 @@
+import asyncio, bisect, functools, logging, time
+from latency import StepLatency, SlowestLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+# --- Metric types ---
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # {label values: float}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        if not self.labelnames and not self.values:
+            lines.append(f"{self.name} 0")
+        for values, total in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {total}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # {label values: [bucket counts..., +Inf count, sum]}
+
+    def observe(self, value: float, *labelvalues):
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.labelnames + ("le",), values + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Read through a callback when the snapshot is built, so nothing is recorded on the hot path."""
+
+    def __init__(self, name: str, help: str, fn, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.fn = fn  # () -> number, or {label values: number} when labelnames are set
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        value = self.fn()
+        if self.labelnames:
+            for values, v in value.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, values)} {v}")
+        elif value is not None:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+# --- Registry ---
+class MetricsRegistry:
+    """
+    Metrics are mutated only on the event loop. A publisher task renders
+    them into an immutable text snapshot and swaps the reference, so readers
+    (the /metrics endpoint, or any other thread) just read self.snapshot
+    with no locking and scrapes never re-render on the hot path.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.snapshot = ""
+        self.snapshot_at = 0.0
+        self._publisher = None
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, fn, labelnames: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, help, fn, labelnames))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                logger.error(f"Failed to render metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+    def publish(self):
+        self.snapshot = self.render()
+        self.snapshot_at = time.time()
+
+    async def _publish_loop(self, interval: float):
+        while True:
+            self.publish()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = 5.0):
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.get_running_loop().create_task(self._publish_loop(interval))
+
+    def stop(self):
+        if self._publisher:
+            self._publisher.cancel()
+            self._publisher = None
+
+
+registry = MetricsRegistry()
+
+handler_latency = registry.histogram(
+    "lfg_handler_seconds", "Time spent in bot event/interaction handlers", ("handler",))
+interactions = registry.counter("lfg_interactions_total", "Interactions received", ("type",))
+rate_limits = registry.counter("lfg_rest_429_total", "REST responses that hit a 429 rate limit")
+
+# Recent per-handler timings and the slowest individual calls, for the !perf owner command
+handler_spans = StepLatency()
+slow_handlers = SlowestLog()
+
+
+def _span_detail(args) -> str:
+    # Handlers take a member, an interaction or a ctx; all carry the guild the call was for
+    for arg in args:
+        guild = getattr(arg, "guild", None)
+        if guild is not None:
+            return f"guild {getattr(guild, 'name', None) or getattr(guild, 'id', '?')}"
+    return ""
+
+
+def timed(name: str):
+    """
+    Records the wrapped coroutine's duration in lfg_handler_seconds{handler=name}
+    and in the handler_spans/slow_handlers timings behind !perf.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                handler_latency.observe(elapsed, name)
+                handler_spans.record(name, elapsed)
+                if slow_handlers.qualifies(elapsed):
+                    slow_handlers.record(name, elapsed, _span_detail(args))
+        return wrapper
+    return decorator
+
+
+class RateLimitCounter(logging.Filter):
+    """Counts discord.http's 429 warnings; never drops the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING and "rate limit" in str(record.msg).lower():
+            rate_limits.inc()
+        return True
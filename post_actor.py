@@ -0,0 +1,105 @@
+import asyncio, time
+import metrics
+from latency import LatencyStats
+
+actor_wait = metrics.registry.histogram(
+    "lfg_post_actor_wait_seconds", "Time a squad mutation waited in its post's queue before being applied")
+actor_contended = metrics.registry.counter(
+    "lfg_post_actor_contended_total", "Squad mutations that arrived while their post's queue was busy")
+
+
+class _Mailbox:
+    __slots__ = ("ops", "message", "worker")
+
+    def __init__(self):
+        self.ops = []  # [(op, future, queued_at)]
+        self.message = None  # latest message seen for this post, handed to on_batch
+        self.worker = None
+
+
+# --- Per-post actors ---
+class PostActors:
+    """
+    Serializes squad mutations per LFG post. Each post gets a mailbox and,
+    while it has work, a single worker task. The worker takes everything
+    queued so far as one batch, applies the ops in arrival order (each op is
+    synchronous, so nothing can interleave with it), then calls
+    on_batch(msg_id, message) once if any op changed the squad, so a burst
+    of clicks costs one persist and one render request instead of one each.
+
+    An op is a callable returning (result, changed); submit() resolves with
+    its result.
+    """
+
+    def __init__(self, on_batch):
+        self.on_batch = on_batch
+        self._mailboxes = {}  # {msg_id: _Mailbox}, only posts with queued or running work
+        self.ops = 0
+        self.batches = 0
+        self.renders = 0
+        self.contended = 0
+        self.max_depth = 0
+        self.wait = LatencyStats()
+
+    async def submit(self, msg_id: int, op, message=None):
+        mailbox = self._mailboxes.get(msg_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[msg_id] = _Mailbox()
+        elif mailbox.ops or mailbox.worker:
+            self.contended += 1
+            actor_contended.inc()
+        fut = asyncio.get_running_loop().create_future()
+        mailbox.ops.append((op, fut, time.perf_counter()))
+        if message is not None:
+            mailbox.message = message
+        if len(mailbox.ops) > self.max_depth:
+            self.max_depth = len(mailbox.ops)
+        if mailbox.worker is None:
+            mailbox.worker = asyncio.get_running_loop().create_task(self._drain(msg_id, mailbox))
+        return await fut
+
+    async def _drain(self, msg_id: int, mailbox: _Mailbox):
+        try:
+            while mailbox.ops:
+                batch, mailbox.ops = mailbox.ops, []
+                changed = False
+                applied_at = time.perf_counter()
+                for op, fut, queued_at in batch:
+                    waited = applied_at - queued_at
+                    self.wait.record(waited)
+                    actor_wait.observe(waited)
+                    try:
+                        result, op_changed = op()
+                    except Exception as e:
+                        if not fut.done():
+                            fut.set_exception(e)
+                        continue
+                    changed = changed or op_changed
+                    if not fut.done():
+                        fut.set_result(result)
+                self.ops += len(batch)
+                self.batches += 1
+                if changed:
+                    self.renders += 1
+                    self.on_batch(msg_id, mailbox.message)
+                # Let clicks that arrive meanwhile pile into the next batch
+                await asyncio.sleep(0)
+        finally:
+            mailbox.worker = None
+            if self._mailboxes.get(msg_id) is mailbox and not mailbox.ops:
+                del self._mailboxes[msg_id]
+
+    def queue_depth(self) -> int:
+        return sum(len(mailbox.ops) for mailbox in self._mailboxes.values())
+
+    def stats(self) -> dict:
+        return {
+            "ops": self.ops,
+            "batches": self.batches,
+            "renders": self.renders,
+            "contended": self.contended,
+            "max_depth": self.max_depth,
+            "active_posts": len(self._mailboxes),
+            "queued": self.queue_depth(),
+            "wait": self.wait.summary(),
+        }
@@ -0,0 +1,149 @@
+import discord
+from array import array
+from collections import OrderedDict
+
+COLOR = 0x3498db  # discord.Color.blue()
+FIELD_LIMIT = 1024  # characters per embed field value
+SQUAD_PAGES = 4  # squad fields per embed, keeping the whole embed well under Discord's 6000 character cap
+
+
+def max_label(max_players: int) -> str:
+    return "∞" if max_players == 0 else str(max_players)
+
+
+def squad_pages(lines) -> list:
+    """
+    Packs squad lines into "Current Squad" fields of at most FIELD_LIMIT
+    characters each. Whatever doesn't fit in SQUAD_PAGES fields is
+    summarized on the last one as "…and N more".
+    """
+    if not lines:
+        return [{"name": "Current Squad", "value": "Empty", "inline": False}]
+    pages, page, size, shown = [], [], 0, 0
+    for line in lines:
+        cost = len(line) + (1 if page else 0)
+        if size + cost > FIELD_LIMIT:
+            if len(pages) == SQUAD_PAGES - 1:
+                break
+            pages.append(page)
+            page, size, cost = [], 0, len(line)
+        page.append(line)
+        size += cost
+        shown += 1
+    if shown < len(lines):
+        while page and size + len(f"\n…and {len(lines) - shown} more") > FIELD_LIMIT:
+            size -= len(page.pop()) + (1 if page else 0)
+            shown -= 1
+        page.append(f"…and {len(lines) - shown} more")
+    pages.append(page)
+    return [
+        {"name": "Current Squad" if i == 0 else "Current Squad (cont.)", "value": "\n".join(page), "inline": False}
+        for i, page in enumerate(pages)
+    ]
+
+
+class _Rendered:
+    # Everything but the squad is fixed once a post is up, so it is built once
+    __slots__ = ("title", "head", "tail", "label", "members", "lines", "squad")
+
+    def __init__(self, title: str, host_name: str, vc_id: int, max_players: int, vc_value: str = None):
+        self.title = title
+        self.head = [
+            {"name": "Host", "value": host_name, "inline": False},
+            {"name": "Voice Channel", "value": f"<#{vc_id}>" if vc_id else (vc_value or "—"), "inline": False},
+        ]
+        self.label = max_label(max_players)
+        self.tail = [{"name": "Max Party Size", "value": self.label, "inline": False}]
+        self.members = array("Q")  # squad as of the last render
+        self.lines = []  # formatted squad lines for self.members
+        self.squad = squad_pages(())
+
+    def update(self, members) -> int:
+        """Re-formats only the lines after the first member that changed; returns how many were formatted."""
+        old = self.members
+        if len(members) >= len(old) and members[:len(old)] == old:
+            keep = len(old)  # joins only append
+        else:
+            keep = 0
+            for a, b in zip(old, members):
+                if a != b:
+                    break
+                keep += 1
+        if keep == len(old) == len(members):
+            return 0
+        del self.lines[keep:]
+        label = self.label
+        self.lines.extend(f"{i + 1}/{label} <@{members[i]}>" for i in range(keep, len(members)))
+        self.members = array("Q", members)
+        self.squad = squad_pages(self.lines)
+        return len(members) - keep
+
+    def embed(self) -> discord.Embed:
+        return discord.Embed.from_dict({
+            "title": self.title, "color": COLOR, "fields": self.head + self.squad + self.tail,
+        })
+
+
+def new_post_embed(title: str, host_name: str, vc_id: int, max_players: int, members) -> discord.Embed:
+    """The embed a post is created with, before it has a message id to be cached under."""
+    rendered = _Rendered(title, host_name, vc_id, max_players)
+    rendered.update(members)
+    return rendered.embed()
+
+
+# --- Cached post embed renderer ---
+class PostEmbeds:
+    """
+    Renders LFG post embeds from the post's state rather than copying the
+    message's embed and searching its fields on every edit. Per post, the
+    fixed fields and the formatted squad lines are kept between renders, so
+    a join formats one new line. Squads too long for one field are paged
+    across a few fields and then summarized. Only the most recently rendered
+    max_cached posts are kept; anything else is rebuilt from state.
+    """
+
+    def __init__(self, max_cached: int = 1000):
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # {msg_id: _Rendered}, least recently rendered first
+        self.renders = 0
+        self.misses = 0
+        self.lines_formatted = 0
+
+    def render(self, post, seed: discord.Embed = None) -> discord.Embed:
+        """
+        seed: the message's current embed, only read when the post predates
+        title/host being stored (restored from an older database).
+        """
+        self.renders += 1
+        rendered = self._cache.get(post.msg_id)
+        if rendered is None:
+            self.misses += 1
+            rendered = self._cache[post.msg_id] = self._build(post, seed)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(post.msg_id)
+        self.lines_formatted += rendered.update(post.members)
+        return rendered.embed()
+
+    def _build(self, post, seed: discord.Embed) -> _Rendered:
+        title, host_name, vc_value = post.title, post.host_name, None
+        if not title and seed is not None:
+            title = seed.title or ""
+            for field in seed.fields:
+                if field.name == "Host":
+                    host_name = field.value
+                elif field.name == "Voice Channel":
+                    vc_value = field.value
+        return _Rendered(title or "LFG", host_name or f"<@{post.host_id}>", post.vc_id, post.max_players, vc_value)
+
+    def forget(self, msg_id: int):
+        self._cache.pop(msg_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._cache),
+            "renders": self.renders,
+            "misses": self.misses,
+            "lines_formatted": self.lines_formatted,
+        }
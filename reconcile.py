@@ -0,0 +1,139 @@
+import discord
+import asyncio, datetime, time, logging
+import metrics
+from rest_priority import scheduler as rest, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+reclaimed = metrics.registry.counter(
+    "lfg_reconciled_total", "Leftover VCs and LFG posts removed by the reconciliation sweep", ("kind",))
+
+
+def bot_created(vc: discord.VoiceChannel, me: discord.Member) -> bool:
+    # Every VC the bot creates (LFG, join-to-create, pool) grants the bot manage_channels on itself
+    return vc.overwrites_for(me).manage_channels is True
+
+
+def is_lfg_post(msg: discord.Message) -> bool:
+    return any(
+        getattr(child, "custom_id", None) == "lfg_join"
+        for row in msg.components for child in getattr(row, "children", ())
+    )
+
+
+# --- Reconciliation sweep ---
+class Reconciler:
+    """
+    Finds what a crash (or a state write that never reached disk) left
+    behind: empty bot-created VCs nobody tracks, LFG posts whose buttons
+    point at squads that no longer exist, and the reverse, squads whose
+    message was deleted out from under them. Each category's channel list is
+    read from cache and each alert channel is paged once; removals go out
+    at background REST priority, at most `concurrency` at a time. Anything
+    younger than `grace` seconds is left alone, since it may still be
+    mid-creation.
+    """
+
+    def __init__(self, concurrency: int = 4, archive_posts: bool = True, grace: float = 120,
+                 scan_limit: int = 200):
+        self.concurrency = concurrency
+        self.archive_posts = archive_posts  # strip the buttons instead of deleting the message
+        self.grace = grace
+        self.scan_limit = scan_limit  # alert channel messages read per sweep
+        self._task = None
+
+    async def sweep(self, guild: discord.Guild, categories, alert_channel, is_tracked_vc, is_live_post,
+                    skip_ids=(), tracked_posts=(), forget_post=None) -> dict:
+        """
+        tracked_posts: msg ids of the squads in state for alert_channel; those
+        whose message wasn't found are passed to `await forget_post(msg_id)`.
+        """
+        start = time.perf_counter()
+        cutoff = discord.utils.utcnow() - datetime.timedelta(seconds=self.grace)
+        scanned_vcs = scanned_posts = 0
+
+        orphans = []
+        for category in categories:
+            for vc in category.voice_channels:
+                scanned_vcs += 1
+                if (vc.id in skip_ids or vc.members or vc.created_at > cutoff or is_tracked_vc(vc.id)
+                        or not bot_created(vc, guild.me)):
+                    continue
+                orphans.append(vc)
+
+        stale = []
+        lost = []
+        if alert_channel is not None:
+            seen = set()
+            oldest_seen = None
+            async for msg in alert_channel.history(limit=self.scan_limit):
+                scanned_posts += 1
+                seen.add(msg.id)
+                oldest_seen = msg.id
+                if (msg.author.id == guild.me.id and msg.created_at <= cutoff and is_lfg_post(msg)
+                        and not is_live_post(msg.id)):
+                    stale.append(msg)
+            # Only the paged window is known: with history left unread, older posts may still exist
+            covered_from = 0 if scanned_posts < self.scan_limit else oldest_seen
+            lost = [
+                msg_id for msg_id in tracked_posts
+                if msg_id not in seen and msg_id > covered_from and discord.utils.snowflake_time(msg_id) <= cutoff
+            ]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def remove_vc(vc):
+            async with semaphore:
+                await rest.run(BACKGROUND, vc.delete(reason="Orphaned LFG voice channel"))
+                reclaimed.inc("vc")
+
+        async def retire_post(msg):
+            async with semaphore:
+                if self.archive_posts:
+                    await rest.run(BACKGROUND, msg.edit(view=None))
+                else:
+                    await rest.run(BACKGROUND, msg.delete())
+                reclaimed.inc("post")
+
+        results = await asyncio.gather(*(remove_vc(vc) for vc in orphans), *(retire_post(msg) for msg in stale),
+                                       return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        for e in failed:
+            logger.error(f"Reconciliation in {guild.name} failed to remove an item: {e}")
+        vc_failures = sum(isinstance(r, Exception) for r in results[:len(orphans)])
+
+        # State-only: the message is already gone, so there is nothing to send
+        lost_posts = 0
+        if forget_post is not None:
+            for msg_id in lost:
+                await forget_post(msg_id)
+                reclaimed.inc("lost_post")
+                lost_posts += 1
+        return {
+            "vcs": len(orphans) - vc_failures,
+            "posts": len(stale) - (len(failed) - vc_failures),
+            "lost_posts": lost_posts,
+            "failed": len(failed),
+            "scanned_vcs": scanned_vcs,
+            "scanned_posts": scanned_posts,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    # --- Periodic sweeps ---
+    async def _run(self, sweep_all, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await sweep_all()
+            except Exception as e:
+                logger.error(f"Periodic reconciliation failed: {e}")
+
+    def start(self, sweep_all, interval: float):
+        # sweep_all: coroutine function covering every configured guild
+        if interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run(sweep_all, interval))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,117 @@
+import asyncio, heapq, inspect, time
+import metrics
+from latency import LatencyStats
+
+# Lower runs first
+USER, BACKGROUND, COSMETIC = 0, 1, 2
+PRIORITY_NAMES = {USER: "user", BACKGROUND: "background", COSMETIC: "cosmetic"}
+
+rest_wait = metrics.registry.histogram(
+    "lfg_rest_wait_seconds", "Time REST calls waited for a slot in the priority scheduler", ("priority",))
+
+
+# --- Priority REST scheduler ---
+class RestScheduler:
+    """
+    Admission gate in front of the bot's own REST calls. At most
+    max_concurrent calls are in flight; waiters are admitted by priority,
+    then arrival order, and `reserved` slots are held back for USER calls so
+    background cleanup and cosmetic edits can never occupy the whole budget
+    while a member is waiting to be moved.
+    """
+
+    def __init__(self, max_concurrent: int = 10, reserved: int = 3):
+        self.max_concurrent = max_concurrent
+        self.reserved = reserved
+        self.in_flight = 0
+        self._queue = []  # heap of (priority, seq, future)
+        self._seq = 0
+        self.queued = {p: 0 for p in PRIORITY_NAMES}
+        self.running = {p: 0 for p in PRIORITY_NAMES}
+        self.waits = {p: LatencyStats() for p in PRIORITY_NAMES}
+
+    def _has_slot(self, priority: int) -> bool:
+        limit = self.max_concurrent if priority == USER else self.max_concurrent - self.reserved
+        return self.in_flight < limit
+
+    def _admit(self, priority: int):
+        self.in_flight += 1
+        self.running[priority] += 1
+
+    async def acquire(self, priority: int):
+        start = time.perf_counter()
+        # Jumping the queue is only allowed when nobody of equal or higher priority is waiting
+        if self._has_slot(priority) and not any(self.queued[p] for p in PRIORITY_NAMES if p <= priority):
+            self._admit(priority)
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self._seq += 1
+            heapq.heappush(self._queue, (priority, self._seq, fut))
+            self.queued[priority] += 1
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release(priority)  # admitted just as we were cancelled
+                else:
+                    self.queued[priority] -= 1
+                    fut.cancel()
+                raise
+        waited = time.perf_counter() - start
+        self.waits[priority].record(waited)
+        rest_wait.observe(waited, PRIORITY_NAMES[priority])
+
+    def release(self, priority: int):
+        self.in_flight -= 1
+        self.running[priority] -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._queue:
+            priority, _, fut = self._queue[0]
+            if fut.done():
+                heapq.heappop(self._queue)  # cancelled waiter
+                continue
+            # Lower priorities only have fewer slots, so if the head can't start nobody can
+            if not self._has_slot(priority):
+                break
+            heapq.heappop(self._queue)
+            self.queued[priority] -= 1
+            self._admit(priority)
+            fut.set_result(None)
+
+    async def run(self, priority: int, awaitable):
+        """Awaits `awaitable` (e.g. member.move_to(vc)) once a slot is free at `priority`."""
+        try:
+            await self.acquire(priority)
+        except BaseException:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()  # never started; avoid the "never awaited" warning
+            raise
+        try:
+            return await awaitable
+        finally:
+            self.release(priority)
+
+    def stats(self) -> dict:
+        return {
+            PRIORITY_NAMES[p]: {"queued": self.queued[p], "in_flight": self.running[p], "wait": self.waits[p].summary()}
+            for p in PRIORITY_NAMES
+        }
+
+    def describe(self) -> str:
+        return "\n".join(
+            f"{PRIORITY_NAMES[p]}: {self.queued[p]} queued, {self.running[p]} in flight, wait {self.waits[p].describe()}"
+            for p in PRIORITY_NAMES
+        )
+
+
+scheduler = RestScheduler()
+metrics.registry.gauge(
+    "lfg_rest_queue_depth", "REST calls waiting in the priority scheduler",
+    lambda: {(PRIORITY_NAMES[p],): count for p, count in scheduler.queued.items()}, ("priority",)
+)
+metrics.registry.gauge(
+    "lfg_rest_in_flight", "REST calls admitted by the priority scheduler and not yet finished",
+    lambda: {(PRIORITY_NAMES[p],): count for p, count in scheduler.running.items()}, ("priority",)
+)
@@ -0,0 +1,27 @@
+# --- Precomputed voice routing ---
+class VoiceRoutes:
+    """Lookup tables built once per config version so voice events never loop over guild configs."""
+
+    def __init__(self, servers: dict):
+        self.join_to_create = {data["join_to_create"]: key for key, data in servers.items()}
+        self.guild_keys = {data["server_id"]: key for key, data in servers.items()}
+
+    def guild_key(self, guild_id: int) -> str:
+        return self.guild_keys.get(guild_id)
+
+
+def route_voice_event(routes: VoiceRoutes, managed_vcs, before_id: int, after_id: int):
+    """
+    Classifies a voice state change with a handful of set/dict lookups.
+    Returns None for events the bot doesn't care about, otherwise
+    (left_managed, joined_managed, join_to_create_key).
+    """
+    if before_id == after_id:
+        # Mute, deafen, stream or video toggles inside the same channel
+        return None
+    left_managed = before_id is not None and before_id in managed_vcs
+    joined_managed = after_id is not None and after_id in managed_vcs
+    join_key = routes.join_to_create.get(after_id) if after_id is not None else None
+    if not (left_managed or joined_managed or join_key):
+        return None
+    return left_managed, joined_managed, join_key
@@ -0,0 +1,172 @@
+import asyncio, json, sqlite3, logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    msg_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    host_id INTEGER NOT NULL,
+    max_players INTEGER NOT NULL,
+    vc_id INTEGER,
+    members TEXT NOT NULL DEFAULT '[]',
+    title TEXT NOT NULL DEFAULT '',
+    host_name TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS vcs (
+    vc_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    owner_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS vc_timers (
+    vc_id INTEGER PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+# --- SQLite state store ---
+class StateStore:
+    """
+    Write-behind snapshot of the bot's in-memory state. Mutations are queued
+    from the event loop without touching disk and flushed in batches on a
+    dedicated worker thread, so the loop never blocks on SQLite.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+        self._conn = None
+        self._dirty = {}  # {(table, key): value} in write order, None = delete
+        self._writer_task = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    # --- Queueing (event loop side) ---
+    def _queue(self, key: tuple, value):
+        # Re-insert so a batch replays in the order the latest writes happened
+        self._dirty.pop(key, None)
+        self._dirty[key] = value
+
+    def put_post(self, msg_id: int, guild_id: int, channel_id: int, host_id: int, max_players: int,
+                 vc_id: int = None, member_ids=(), title: str = "", host_name: str = ""):
+        self._queue(("posts", msg_id), (msg_id, guild_id, channel_id, host_id, max_players, vc_id,
+                                        json.dumps(list(member_ids)), title, host_name))
+
+    def put_members(self, msg_id: int, member_ids):
+        self._queue(("members", msg_id), json.dumps(list(member_ids)))
+
+    def delete_post(self, msg_id: int):
+        self._queue(("members", msg_id), None)
+        self._queue(("posts", msg_id), None)
+
+    def put_vc(self, vc_id: int, guild_id: int, kind: str, owner_id: int = None):
+        self._queue(("vcs", vc_id), (vc_id, guild_id, kind, owner_id))
+
+    def delete_vc(self, vc_id: int):
+        self._queue(("vc_timers", vc_id), None)
+        self._queue(("vcs", vc_id), None)
+
+    def put_timer(self, vc_id: int, expires_at: float):
+        self._queue(("vc_timers", vc_id), expires_at)
+
+    def clear_timer(self, vc_id: int):
+        self._queue(("vc_timers", vc_id), None)
+
+    # --- Lifecycle ---
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._open)
+        self._writer_task = loop.create_task(self._writer())
+
+    async def load(self) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._load)
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        batch, self._dirty = self._dirty, {}
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._apply, batch)
+            self.flushes += 1
+            self.rows_written += len(batch)
+        except Exception as e:
+            logger.error(f"State store flush failed, retrying next cycle: {e}")
+            # Keep newer writes that arrived during the failed flush
+            batch.update(self._dirty)
+            self._dirty = batch
+
+    async def close(self):
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _writer(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # --- Worker thread side ---
+    def _open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Databases from before post titles were stored
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(posts)")}
+        for column in ("title", "host_name"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE posts ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    def _close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def _load(self) -> dict:
+        posts = [
+            {"msg_id": r[0], "guild_id": r[1], "channel_id": r[2], "host_id": r[3], "max_players": r[4],
+             "vc_id": r[5], "members": json.loads(r[6]), "title": r[7], "host_name": r[8]}
+            for r in self._conn.execute(
+                "SELECT msg_id, guild_id, channel_id, host_id, max_players, vc_id, members, title, host_name "
+                "FROM posts")
+        ]
+        timers = dict(self._conn.execute("SELECT vc_id, expires_at FROM vc_timers"))
+        vcs = [
+            {"vc_id": r[0], "guild_id": r[1], "kind": r[2], "owner_id": r[3], "expires_at": timers.get(r[0])}
+            for r in self._conn.execute("SELECT vc_id, guild_id, kind, owner_id FROM vcs")
+        ]
+        return {"posts": posts, "vcs": vcs}
+
+    def _apply(self, batch: dict):
+        with self._conn:
+            for (table, key), value in batch.items():
+                if table == "posts":
+                    if value is None:
+                        self._conn.execute("DELETE FROM posts WHERE msg_id = ?", (key,))
+                    else:
+                        self._conn.execute("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", value)
+                elif table == "members":
+                    if value is not None:
+                        self._conn.execute("UPDATE posts SET members = ? WHERE msg_id = ?", (value, key))
+                elif table == "vcs":
+                    if value is None:
+                        self._conn.execute("DELETE FROM vcs WHERE vc_id = ?", (key,))
+                    else:
+                        self._conn.execute("INSERT OR REPLACE INTO vcs VALUES (?, ?, ?, ?)", value)
+                elif table == "vc_timers":
+                    if value is None:
+                        self._conn.execute("DELETE FROM vc_timers WHERE vc_id = ?", (key,))
+                    else:
+                        self._conn.execute("INSERT OR REPLACE INTO vc_timers VALUES (?, ?)", (key, value))
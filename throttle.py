@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+import metrics
+
+throttled = metrics.registry.counter(
+    "lfg_throttled_total", "Actions refused by the per-user/per-guild throttle", ("action", "scope"))
+
+
+# --- Token buckets ---
+class Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class BucketMap:
+    """
+    Token buckets keyed by id, `burst` deep and refilling at rate/per. A bucket
+    left alone long enough to refill completely is indistinguishable from a
+    new one, so it is evicted: keys are kept in last-use order and idle ones
+    are dropped from the front as new keys arrive. max_keys caps memory even
+    under a flood of distinct ids by evicting the least recently used.
+    """
+
+    def __init__(self, rate: float, per: float, burst: int = None, max_keys: int = 50_000):
+        self.rate = rate / per  # tokens per second
+        self.burst = burst or rate
+        self.idle_after = self.burst / self.rate  # seconds to refill from empty
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # {key: Bucket}, least recently used first
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _bucket(self, key, now: float) -> Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict(now)
+            bucket = self._buckets[key] = Bucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _evict(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            key, oldest = next(iter(buckets.items()))
+            if now - oldest.updated < self.idle_after and len(buckets) < self.max_keys:
+                break
+            del buckets[key]
+            self.evicted += 1
+
+    def retry_after(self, key, now: float) -> float:
+        bucket = self._bucket(key, now)
+        return 0.0 if bucket.tokens >= 1 else (1 - bucket.tokens) / self.rate
+
+    def consume(self, key, now: float):
+        self._bucket(key, now).tokens -= 1
+
+
+# --- Per-user + per-guild throttle ---
+class Throttle:
+    """
+    An action is allowed only while both the user's and the guild's bucket
+    have a token; neither is charged for a refused attempt, so one user
+    hammering their own limit doesn't drain the guild budget.
+    """
+
+    def __init__(self, action: str, user_rate: float, user_per: float, guild_rate: float, guild_per: float,
+                 max_keys: int = 50_000):
+        self.action = action
+        self.users = BucketMap(user_rate, user_per, max_keys=max_keys)
+        self.guilds = BucketMap(guild_rate, guild_per, max_keys=max_keys)
+        self.allowed = 0
+        self.refused = 0
+
+    def check(self, guild_id: int, user_id: int):
+        """Returns (allowed, retry_after seconds)."""
+        now = time.monotonic()
+        user_wait = self.users.retry_after(user_id, now)
+        guild_wait = self.guilds.retry_after(guild_id, now)
+        if user_wait or guild_wait:
+            self.refused += 1
+            throttled.inc(self.action, "user" if user_wait >= guild_wait else "guild")
+            return False, max(user_wait, guild_wait)
+        self.users.consume(user_id, now)
+        self.guilds.consume(guild_id, now)
+        self.allowed += 1
+        return True, 0.0
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "refused": self.refused,
+            "user_buckets": len(self.users),
+            "guild_buckets": len(self.guilds),
+            "evicted": self.users.evicted + self.guilds.evicted,
+        }
@@ -0,0 +1,148 @@
+import discord
+import asyncio, logging
+from collections import deque
+from latency import LatencyStats
+from rest_priority import scheduler as rest, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+IDLE_NAME = "⏳ Open VC"
+
+
+def idle_overwrites(guild: discord.Guild) -> dict:
+    # Locked until claimed so nobody wanders into a pooled channel
+    return {
+        guild.default_role: discord.PermissionOverwrite(connect=False),
+        guild.me: discord.PermissionOverwrite(connect=True, manage_channels=True)
+    }
+
+
+# --- Pre-warmed voice channel pool ---
+class VoicePool:
+    """
+    Keeps a few idle voice channels per category so join-to-create can rename
+    and hand one out instead of waiting on create_voice_channel. Claimed
+    channels are replenished in the background and a reaper trims surplus or
+    vanished idle channels.
+    """
+
+    def __init__(self, idle_name: str = IDLE_NAME, reap_interval: float = 300):
+        self.idle_name = idle_name
+        self.reap_interval = reap_interval
+        self.sizes = {}  # {category.id: target idle count}
+        self._categories = {}  # {category.id: discord.CategoryChannel}
+        self._idle = {}  # {category.id: deque[vc.id]}
+        self._idle_ids = set()  # {vc.id} across all categories
+        self._filling = {}  # {category.id: asyncio.Task}
+        self._reaper = None
+        self.pooled = LatencyStats()  # lobby -> moved, pooled channel
+        self.cold = LatencyStats()  # lobby -> moved, freshly created channel
+        self.claims = 0
+        self.misses = 0
+        self.created = 0
+        self.reaped = 0
+
+    def register(self, category: discord.CategoryChannel, size: int):
+        self.sizes[category.id] = size
+        self._categories[category.id] = category
+        idle = self._idle.setdefault(category.id, deque())
+        # Adopt idle channels left behind by a previous run
+        for vc in category.voice_channels:
+            if vc.name == self.idle_name and not vc.members and vc.id not in self._idle_ids:
+                idle.append(vc.id)
+                self._idle_ids.add(vc.id)
+        self.replenish(category.id)
+
+    def is_idle(self, vc_id: int) -> bool:
+        return vc_id in self._idle_ids
+
+    def idle_count(self) -> int:
+        return len(self._idle_ids)
+
+    def claim(self, category: discord.CategoryChannel):
+        idle = self._idle.get(category.id)
+        if idle is None:
+            return None
+        vc = None
+        while idle:
+            vc_id = idle.popleft()
+            self._idle_ids.discard(vc_id)
+            candidate = category.guild.get_channel(vc_id)
+            if isinstance(candidate, discord.VoiceChannel) and not candidate.members:
+                vc = candidate
+                break
+        if vc is None:
+            self.misses += 1
+        else:
+            self.claims += 1
+        self.replenish(category.id)
+        return vc
+
+    # --- Background maintenance ---
+    def replenish(self, category_id: int):
+        task = self._filling.get(category_id)
+        if task and not task.done():
+            return
+        self._filling[category_id] = asyncio.get_running_loop().create_task(self._fill(category_id))
+
+    async def _fill(self, category_id: int):
+        category = self._categories[category_id]
+        guild = category.guild
+        idle = self._idle[category_id]
+        try:
+            while len(idle) < self.sizes.get(category_id, 0):
+                vc = await rest.run(BACKGROUND, guild.create_voice_channel(
+                    self.idle_name, overwrites=idle_overwrites(guild), category=category))
+                idle.append(vc.id)
+                self._idle_ids.add(vc.id)
+                self.created += 1
+        except Exception as e:
+            logger.error(f"VC pool replenish failed for category {category_id}: {e}")
+
+    async def reap(self):
+        for category_id, idle in list(self._idle.items()):
+            guild = self._categories[category_id].guild
+            for vc_id in list(idle):
+                if not isinstance(guild.get_channel(vc_id), discord.VoiceChannel):
+                    idle.remove(vc_id)
+                    self._idle_ids.discard(vc_id)
+            while len(idle) > self.sizes.get(category_id, 0):
+                vc_id = idle.pop()
+                self._idle_ids.discard(vc_id)
+                vc = guild.get_channel(vc_id)
+                try:
+                    await rest.run(BACKGROUND, vc.delete(reason="Surplus pooled VC"))
+                    self.reaped += 1
+                except Exception as e:
+                    logger.error(f"Failed to reap pooled VC {vc_id}: {e}")
+            self.replenish(category_id)
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"VC pool reaper failed: {e}")
+
+    def start(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    def stop(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for task in self._filling.values():
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "idle": self.idle_count(),
+            "claims": self.claims,
+            "misses": self.misses,
+            "created": self.created,
+            "reaped": self.reaped,
+            "pooled": self.pooled.summary(),
+            "cold": self.cold.summary(),
+        }
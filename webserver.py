@@ -1,12 +1,97 @@
-from flask import Flask
-from threading import Thread
-
-app = Flask('')
-@app.route('/')
-def home():
-    return 'Bot is running'
-def run():
-    app.run(host='0.0.0.0', port=8080)
-def keep_alive():
-   t= Thread(target=run)
-   t.start()
\ No newline at end of file
+from aiohttp import web
+import time, math
+import metrics
+
+# Served from the bot's own event loop (no extra thread, no Flask/Werkzeug)
+READY_MAX_ACK_AGE = 90  # seconds since the last heartbeat ACK before we report not ready
+READY_MAX_LOOP_LAG = 1.0  # seconds
+
+_runner = None
+
+
+def last_heartbeat_ack_age(ws) -> float:
+    keep_alive = getattr(ws, "_keep_alive", None)
+    last_ack = getattr(keep_alive, "_last_ack", None)
+    if last_ack is None:
+        return None
+    return time.perf_counter() - last_ack
+
+
+def shard_health(bot) -> dict:
+    shards = {}
+    for shard_id, shard in getattr(bot, "shards", {}).items():
+        ws = getattr(getattr(shard, "_parent", None), "ws", None)
+        shards[str(shard_id)] = {
+            "connected": not shard.is_closed(),
+            "latency_ms": shard.latency * 1000 if math.isfinite(shard.latency) else None,
+            "last_heartbeat_ack_s": last_heartbeat_ack_age(ws),
+        }
+    return shards
+
+
+def health(bot, lag_monitor) -> dict:
+    latency = bot.latency
+    shards = shard_health(bot)
+    if shards:
+        ack_ages = [s["last_heartbeat_ack_s"] for s in shards.values() if s["last_heartbeat_ack_s"] is not None]
+        ack_age = max(ack_ages) if ack_ages else None
+    else:
+        ack_age = last_heartbeat_ack_age(getattr(bot, "ws", None))
+    status = {
+        "gateway_connected": bot.is_ready() and not bot.is_closed()
+                             and all(s["connected"] for s in shards.values()),
+        "gateway_latency_ms": latency * 1000 if math.isfinite(latency) else None,
+        "last_heartbeat_ack_s": ack_age,
+        "loop_lag_ms": lag_monitor.lag * 1000 if lag_monitor else None,
+    }
+    if shards:
+        status["shards"] = shards
+    return status
+
+
+def create_app(bot, lag_monitor=None, state_dump=None) -> web.Application:
+    async def home(request):
+        return web.Response(text='Bot is running')
+
+    async def healthz(request):
+        # Answering at all proves the loop is alive
+        return web.json_response({"alive": True, **health(bot, lag_monitor)})
+
+    async def readyz(request):
+        status = health(bot, lag_monitor)
+        ready = (
+            status["gateway_connected"]
+            and (status["last_heartbeat_ack_s"] is None or status["last_heartbeat_ack_s"] < READY_MAX_ACK_AGE)
+            and (lag_monitor is None or lag_monitor.lag < READY_MAX_LOOP_LAG)
+        )
+        return web.json_response({"ready": ready, **status}, status=200 if ready else 503)
+
+    async def state(request):
+        return web.json_response(state_dump() if state_dump else {})
+
+    async def prometheus_metrics(request):
+        # Serve the periodically published snapshot so scrapes don't re-render on the loop
+        text = metrics.registry.snapshot or metrics.registry.render()
+        return web.Response(body=text.encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    app = web.Application()
+    app.router.add_get('/', home)
+    app.router.add_get('/healthz', healthz)
+    app.router.add_get('/readyz', readyz)
+    app.router.add_get('/state', state)
+    app.router.add_get('/metrics', prometheus_metrics)
+    return app
+
+
+async def start(bot, host: str = '0.0.0.0', port: int = 8080, lag_monitor=None, state_dump=None):
+    global _runner
+    _runner = web.AppRunner(create_app(bot, lag_monitor, state_dump), access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+
+
+async def stop():
+    global _runner
+    if _runner:
+        await _runner.cleanup()
+        _runner = None